@@ -0,0 +1,53 @@
+""" Analyses a whole batch of candidate bases at once: determinant, span dimension, conditioning and inverse """
+
+import sys
+import time
+import pathlib
+import argparse
+import numpy as np
+import config as cfg
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+import transform_core as tc
+
+def candidate_bases(count: int, dimension: int, singular_share: float, seed: int) -> np.ndarray:
+    """
+    --> Random integer bases like the ones in config.py, with singular_share of them made to lose a dimension.
+    --> The first candidate is always config.TRANSFORMED_BASIS when the dimension is 2.
+    """
+    rng = np.random.default_rng(seed)
+    bases = rng.integers(-3, 4, (count, dimension, dimension))
+    singular = rng.random(count) < singular_share
+    # the last basis vector becomes a multiple of the first, so the span collapses.
+    bases[singular, -1] = bases[singular, 0] * rng.integers(-2, 3, (np.count_nonzero(singular), 1))
+    if dimension == 2:
+        bases[0] = cfg.TRANSFORMED_BASIS
+    return bases
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--dimension", type=int, default=2)
+    parser.add_argument("--singular-share", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--show", type=int, default=5, help="number of the best conditioned bases to print")
+    args = parser.parse_args()
+
+    bases = candidate_bases(args.count, args.dimension, args.singular_share, args.seed)
+    start = time.perf_counter()
+    analysis = tc.BasisAnalysis(bases)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(analysis)} bases of dimension {analysis.dimension} analysed in {elapsed*1000:.1f} ms")
+    ranks, counts = np.unique(analysis.ranks, return_counts=True)
+    for rank, count in zip(ranks, counts):
+        print(f"  span dimension {rank}: {count} bases")
+    print(f"  invertible: {np.count_nonzero(analysis.invertible)}, orientation flipped (det < 0): {np.count_nonzero(analysis.determinants < 0)}")
+
+    print(f"\n{'basis':>40} {'det':>8} {'rank':>5} {'condition':>10}")
+    for index in np.argsort(analysis.condition_numbers)[:args.show]:
+        print(
+            f"{tc.matrix_label(analysis.bases[index]):>40} {analysis.determinants[index]:8.2f} "
+            f"{analysis.ranks[index]:5d} {analysis.condition_numbers[index]:10.3f}"
+        )
@@ -0,0 +1,47 @@
+""" Compares figure build time, HTML size, figure payload and trace count of the Grid render modes """
+
+import os
+import sys
+import time
+import pathlib
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+import transform_core as tc
+from transform_core.grid import RENDER_MODES
+
+TRANSFORM = np.array([[1, -2], [1, 0]])
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 50, 200])
+    parser.add_argument("--modes", nargs="+", default=list(RENDER_MODES), choices=RENDER_MODES)
+    args = parser.parse_args()
+
+    print(f"{'GRID_SIZE':>10} {'mode':>8} {'traces':>8} {'build (s)':>10} {'write (s)':>10} {'HTML (KB)':>10} {'payload (KB)':>13}")
+    with tempfile.TemporaryDirectory() as output_dir:
+        for grid_size in args.sizes:
+            grid = tc.TransformPipeline().then(TRANSFORM).apply(tc.InitialBasis(np.eye(2), grid_size, 1).grid)
+            for render_mode in args.modes:
+                grid_obj = tc.Grid(grid_size, ["#33cc33", "#006600"], "#3399ff", render_mode=render_mode)
+                name = os.path.join(output_dir, f"{grid_size}-{render_mode}.html")
+
+                start = time.perf_counter()
+                fig = grid_obj.plot_grid(TRANSFORM, grid, name, "benchmark")
+                total_time = time.perf_counter() - start
+
+                # plot_grid writes the file itself, time the write again on its own to split the two.
+                start = time.perf_counter()
+                fig.write_html(name)
+                write_time = time.perf_counter() - start
+
+                # the HTML embeds the ~4.5 MB plotly.js bundle, the figure data alone is what differs between modes.
+                payload = len(fig.to_html(include_plotlyjs=False, full_html=False).encode())
+
+                print(
+                    f"{grid_size:>10} {render_mode:>8} {len(fig.data):>8} {total_time-write_time:10.4f} "
+                    f"{write_time:10.4f} {os.path.getsize(name)/1024:10.1f} {payload/1024:13.1f}"
+                )
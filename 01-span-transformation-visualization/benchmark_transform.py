@@ -0,0 +1,85 @@
+""" Compares the per-point transformation loop against the batched transformation """
+
+import os
+import sys
+import time
+import timeit
+import tempfile
+import pathlib
+import argparse
+import numpy as np
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+from transform_core import InitialBasis, InverseTransformBasis, batch_transform, blockwise_transform
+
+TRANSFORM = np.array([[1, -2], [1, 0]])
+
+def make_grid(grid_size: int) -> np.ndarray:
+    grid_cords = np.arange(-grid_size, grid_size+1, 1)
+    x_cords, y_cords = np.meshgrid(grid_cords, grid_cords)
+    return np.stack([x_cords, y_cords], axis=-1)
+
+def loop_transform(basis: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    # same as the original __main__ block, one (2, 1) matmul per grid point.
+    transformed_cords = []
+    for line_cords in grid:
+        for cords in line_cords:
+            transformed_cords.append(
+                np.matmul(np.transpose(basis), cords.reshape((-1, 1))).reshape(1, -1)
+            )
+    return np.asarray(transformed_cords).reshape(grid.shape)
+
+def best_of(statement, repeat: int) -> float:
+    return min(timeit.repeat(statement, number=1, repeat=repeat))
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 50, 200, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--loop-limit", type=int, default=200, help="largest GRID_SIZE the per-point loop is run for")
+    parser.add_argument(
+        "--memmap-size", type=int, default=None, help="also build a memory-mapped float32 grid this large and transform it in place"
+    )
+    args = parser.parse_args()
+
+    print(f"{'GRID_SIZE':>10} {'points':>10} {'loop (s)':>12} {'batch (s)':>12} {'float32 (s)':>12} {'in-place (s)':>12} {'inverse (s)':>12} {'speedup':>10}")
+    inverse = InverseTransformBasis(TRANSFORM)
+    for grid_size in args.sizes:
+        grid = make_grid(grid_size).astype(np.float64)
+        buffer = np.empty_like(grid)
+        buffer_32 = np.empty(grid.shape, dtype=np.float32)
+
+        batch_time = best_of(lambda: batch_transform(TRANSFORM, grid), args.repeat)
+        float32_time = best_of(lambda: batch_transform(TRANSFORM, grid, out=buffer_32, dtype=np.float32), args.repeat)
+        in_place_time = best_of(lambda: batch_transform(TRANSFORM, grid, out=buffer), args.repeat)
+        # the cached inverse of TRANSFORM, applied by the same batched multiply.
+        inverse_time = best_of(lambda: inverse.perform_batch_transformation(grid), args.repeat)
+
+        if grid_size <= args.loop_limit:
+            loop_time = best_of(lambda: loop_transform(TRANSFORM, grid), 1)
+            if not np.allclose(loop_transform(TRANSFORM, grid), batch_transform(TRANSFORM, grid)):
+                sys.exit(f"batched transform does not match the loop for GRID_SIZE={grid_size}")
+            loop_column, speedup_column = f"{loop_time:12.5f}", f"{loop_time/batch_time:9.1f}x"
+        else:
+            loop_column, speedup_column = f"{'skipped':>12}", f"{'-':>10}"
+
+        print(
+            f"{grid_size:>10} {grid[..., 0].size:>10} {loop_column} {batch_time:12.5f} "
+            f"{float32_time:12.5f} {in_place_time:12.5f} {inverse_time:12.5f} {speedup_column}"
+        )
+
+    if args.memmap_size is not None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "grid.npy")
+            start = time.perf_counter()
+            grid = InitialBasis(np.eye(2), args.memmap_size, 1, np.float32, backing_file=path).grid
+            build_time = time.perf_counter() - start
+            start = time.perf_counter()
+            blockwise_transform(TRANSFORM, grid, out=grid, dtype=np.float32)
+            transform_time = time.perf_counter() - start
+            print(
+                f"memmap GRID_SIZE={args.memmap_size}: {grid[..., 0].size} points, {os.path.getsize(path)/2**20:.0f} MB on disk, "
+                f"build {build_time:.2f}s, blockwise in-place transform {transform_time:.2f}s"
+            )
+            del grid
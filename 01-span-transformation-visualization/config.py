@@ -4,10 +4,34 @@ import numpy as np
 GRID_SIZE = 3
 GRID_SPACING = 1
 
+# rendering ("lines", "packed" or "webgl", see transform_core.grid)
+RENDER_MODE = "lines"
+
+# export ("standalone", "shared" or "json", see transform_core.export), combined puts every stage in one HTML file
+EXPORT_MODE = "standalone"
+EXPORT_COMBINED = None
+
+# worker processes of the parallel export (--export, --batch-export), None is one per core
+EXPORT_WORKERS = None
+
+# animation (milliseconds each stage or interpolation frame is shown for, frames per transition)
+FRAME_DURATION = 3000
+INTERPOLATION_STEPS = 30
+INTERPOLATION_FRAME_DURATION = 100
+
 # vectors
 INITIAL_BASIS = np.array([[1, 0], [0, 1]])
 TRANSFORMED_BASIS = np.array([[1, -2], [1, 0]])
 
+# batch export (--batch-export <folder>), every basis is applied to the initial grid and written as its own figure
+BATCH_BASES = [
+    TRANSFORMED_BASIS,
+    np.array([[0, 1], [-1, 0]]),
+    np.array([[1, 1], [0, 1]]),
+    np.array([[2, 0], [0, 0.5]]),
+    np.array([[1, 2], [2, 4]])
+]
+
 # colors
 BASIS_COLORS = ["#33cc33", "#006600"]
 GRID_COLOR = "#3399ff"
@@ -1,79 +1,23 @@
-import time
+""" Span of a transformed basis and its inverse, served as a Streamlit app or computed / exported headless """
+
+from __future__ import annotations
+
+import sys
+import pathlib
 import numpy as np
 import config as cfg
-import streamlit as st
-import plotly.graph_objs as go
 
-class Grid():
+from typing import TYPE_CHECKING
 
-    def __init__(self) -> None:
-        pass
-
-    def plot_basis(self, basis: np.ndarray, fig: go.Figure) -> go.Figure:
-        basis_annotation = []
-        for index, bais_vector in enumerate(basis):
-            basis_annotation.append(
-                go.layout.Annotation(
-                    {
-                        "x": bais_vector[0],
-                        "y": bais_vector[1],
-                        "xref": "x",
-                        "yref": "y",
-                        "axref": "x",
-                        "ayref": "y",
-                        "ax": 0,
-                        "ay": 0,
-                        "arrowhead": 5,
-                        "arrowwidth": 3,
-                        "arrowcolor": cfg.BASIS_COLORS[index]
-                    }
-                )
-            )
-        fig.update_layout(annotations=basis_annotation)
-        return fig
-        
-    def plot_grid(self, basis: np.ndarray, grid: np.ndarray, name: str) -> go.Figure:
-        x_traces = []
-        y_traces = []
-        for index in range(1, grid.shape[0]-1, 1):
-            x_traces.append(
-                go.Scatter(
-                    x=grid[index, :, 0], y=grid[index, :, 1], mode="lines+markers",
-                    hovertemplate="(%{x}, %{y})<extra></extra>", marker_color=cfg.GRID_COLOR
-                )
-            )
-        for index in range(1, grid.shape[1]-1, 1):
-            y_traces.append(
-                go.Scatter(
-                    x=grid[:, index, 0], y=grid[:, index, 1], mode="lines+markers",
-                    hovertemplate="(%{x}, %{y})<extra></extra>", marker_color=cfg.GRID_COLOR
-                )
-            )
-        fig = go.Figure(x_traces + y_traces)
-
-        if name.split("-")[0] == "00":
-            plot_title = "I = [[1, 0], [0, 1]]"
-        elif name.split("-")[0] == "01":
-            plot_title = "I * T = [[1, -2], [1, 0]]"
-        elif name.split("-")[0] == "02":
-            plot_title = "I * T^-1 = [[0, -0.5], [1, 0.5]]"
-        else:
-            plot_title = "I * T * T^-1 = I"
-
-        fig.update_layout(
-            title=plot_title,
-            xaxis_title="X axis",
-            yaxis_title="Y axis",
-            showlegend=False,
-            template="plotly_dark",
-            yaxis={"range": [-cfg.GRID_SIZE, cfg.GRID_SIZE]},
-            xaxis={"range": [-cfg.GRID_SIZE, cfg.GRID_SIZE]}
-        )
-        fig = self.plot_basis(basis, fig)
-        fig.write_html(name)
-        return fig
-
-class InitialBasis():
+# the shared transform core lives at the root of the repository.
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+import transform_core as tc
+
+# plotly is only loaded once a figure is built, --compute-only never imports it.
+if TYPE_CHECKING:
+    import plotly.graph_objs as go
+
+class InitialBasis(tc.InitialBasis):
 
     def __init__(self) -> None:
         """
@@ -84,13 +28,9 @@ class InitialBasis():
         """
         # basis vectors are represented in a list one after the other for easy of coding.
         # here it looks same as the basis matrix.
-        self.basis = cfg.INITIAL_BASIS
-        self.grid_cords = np.arange(-cfg.GRID_SIZE, cfg.GRID_SIZE+1, cfg.GRID_SPACING)
-        self.grid = np.asarray(
-            [[x_cord, y_cord] for y_cord in self.grid_cords for x_cord in self.grid_cords]
-            ).reshape((2*cfg.GRID_SIZE+1, 2*cfg.GRID_SIZE+1, 2))
-        
-class TransformedBasis():
+        super().__init__(cfg.INITIAL_BASIS, cfg.GRID_SIZE, cfg.GRID_SPACING)
+
+class TransformedBasis(tc.Basis):
 
     def __init__(self) -> None:
         """
@@ -100,13 +40,10 @@ class TransformedBasis():
         --> The matrix with these basis vectors is [[1, 3], [-2, 0]].
         """
         # basis vectors are represented in a list one after the other for easy of coding.
-        # here the transpose will be the correct matrix representation of these basis vectors (see line 107).
-        self.basis = cfg.TRANSFORMED_BASIS
+        # here the transpose will be the correct matrix representation of these basis vectors (see tc.Basis.matrix).
+        super().__init__(cfg.TRANSFORMED_BASIS)
 
-    def perform_transformation(self, vector: np.ndarray) -> np.ndarray:
-        return np.matmul(np.transpose(self.basis), vector)
-    
-class InverseTransformBasis():
+class InverseTransformBasis(tc.InverseTransformBasis):
 
     def __init__(self, original_basis: np.ndarray) -> None:
         """
@@ -116,27 +53,29 @@ class InverseTransformBasis():
         --> invesre of one matrix above gives the other.
         --> [[0, 1], [-1, 0]]^-1 = [[0, -1], [1, 0]] and vice versa.
         """
-        # takes in vectors, one after the other as before, not in matrix form.
-        # stores then in the vector after vector format as well, hence the two transpose.
-        self.basis = np.transpose(np.linalg.inv(np.transpose(original_basis)))
+        super().__init__(original_basis)
 
-    def perform_inverse_transformation(self, vector: np.ndarray) -> np.ndarray:
-        return np.matmul(np.transpose(self.basis), vector)
-
-if __name__ == "__main__":
-
-    grid_obj = Grid()
+def compute_stages() -> list[dict]:
+    """
+    --> The basis, grid, file name and title of every stage, as keyword arguments of tc.Grid.plot_grid.
+    --> Only numpy is needed here, nothing is rendered.
+    """
     initial_basis_obj = InitialBasis()
     transformed_basis_obj = TransformedBasis()
     inverse_transform_basis_obj = InverseTransformBasis(transformed_basis_obj.basis)
 
+    # T and then T^-1 are queued and fused into one matrix before the grid is touched.
+    pipeline = tc.TransformPipeline().then(transformed_basis_obj, "T").then(inverse_transform_basis_obj, "T^-1")
+
 
     # ========================================================================================================
     # ORIGINAL GRID
     # ========================================================================================================
 
-    # ploting initial basis
-    initial_grid_fig = grid_obj.plot_grid(initial_basis_obj.basis, initial_basis_obj.grid, "00-initial_basis.html")
+    initial_stage = {
+        "basis": initial_basis_obj.basis, "grid": initial_basis_obj.grid, "name": "00-initial_basis.html",
+        "title": f"I = {tc.matrix_label(initial_basis_obj.basis)}"
+    }
 
 
     # ========================================================================================================
@@ -144,18 +83,12 @@ if __name__ == "__main__":
     # ========================================================================================================
 
     # calculating transformation by the new basis
-    transformed_cords = []
-    for line_cords in initial_basis_obj.grid:
-        for cords in line_cords:
-            transformed_cords.append(
-                transformed_basis_obj.perform_transformation(
-                    cords.reshape((-1, 1))
-                ).reshape(1, -1)
-            )
-    transformed_grid = np.asarray(transformed_cords).reshape((2*cfg.GRID_SIZE+1, 2*cfg.GRID_SIZE+1, 2))
+    transformed_grid = pipeline.frame(1, initial_basis_obj.grid)
 
-    # plotting the new basis
-    transformed_grid_fig = grid_obj.plot_grid(transformed_basis_obj.basis, transformed_grid, "01-transformed_grid.html")
+    transformed_stage = {
+        "basis": transformed_basis_obj.basis, "grid": transformed_grid, "name": "01-transformed_grid.html",
+        "title": f"I * T = {tc.matrix_label(transformed_basis_obj.basis)}"
+    }
 
 
     # ========================================================================================================
@@ -163,51 +96,52 @@ if __name__ == "__main__":
     # ========================================================================================================
 
     # calculating the inverse transformation grid
-    inverse_transform_cords = []
-    for line_cords in initial_basis_obj.grid:
-        for cords in line_cords:
-            inverse_transform_cords.append(
-                inverse_transform_basis_obj.perform_inverse_transformation(
-                    cords.reshape((-1, 1))
-                ).reshape(1, -1)
-            )
-    inverse_transform_grid = np.asarray(inverse_transform_cords).reshape((2*cfg.GRID_SIZE+1, 2*cfg.GRID_SIZE+1, 2))
+    inverse_transform_grid = inverse_transform_basis_obj.perform_batch_transformation(initial_basis_obj.grid)
 
-    # plotting the inverse transform matrix
-    inverse_transform_grid_fig = grid_obj.plot_grid(inverse_transform_basis_obj.basis, inverse_transform_grid, "02-inverse_transform_grid.html")
+    inverse_transform_stage = {
+        "basis": inverse_transform_basis_obj.basis, "grid": inverse_transform_grid, "name": "02-inverse_transform_grid.html",
+        "title": f"I * T^-1 = {tc.matrix_label(inverse_transform_basis_obj.basis)}"
+    }
 
 
     # ========================================================================================================
     # INVERSE TRANSFORMED GRID
     # ========================================================================================================
 
-    # calculating inverse transformation from the new basis to original basis
-    inverse_transformed_cords = []
-    for line_cords in transformed_grid:
-        for cords in line_cords:
-            inverse_transformed_cords.append(
-                inverse_transform_basis_obj.perform_inverse_transformation(
-                    cords.reshape((-1, 1))
-                ).reshape(1, -1)
-            )
-    inverse_transformed_grid = np.asarray(inverse_transformed_cords).reshape((2*cfg.GRID_SIZE+1, 2*cfg.GRID_SIZE+1, 2))
+    # calculating inverse transformation from the new basis to original basis (T * T^-1 = I, so the grid pass is skipped)
+    inverse_transformed_grid = pipeline.frame(2, initial_basis_obj.grid)
 
     # calculating the inverse of the transformed basis
-    inverse_transformed_basis = np.transpose(
-        np.matmul(np.transpose(inverse_transform_basis_obj.basis), np.transpose(transformed_basis_obj.basis))
-    )
+    inverse_transformed_basis = pipeline.basis()
 
-    # plotting the inverted basis
-    inverse_transformed_grid_fig = grid_obj.plot_grid(inverse_transformed_basis, inverse_transformed_grid, "03-inverse_transformed_grid.html")
+    # round-off in T * T^-1 would show up in the title, so the identity is named as such
+    inverse_transformed_title = "I" if pipeline.is_identity() else tc.matrix_label(inverse_transformed_basis)
+    inverse_transformed_stage = {
+        "basis": inverse_transformed_basis, "grid": inverse_transformed_grid, "name": "03-inverse_transformed_grid.html",
+        "title": f"I * T * T^-1 = {inverse_transformed_title}"
+    }
 
 
     # ========================================================================================================
-    
-    all_figs = [initial_grid_fig, transformed_grid_fig, inverse_transform_grid_fig, inverse_transformed_grid_fig]
-
-    placeholder = st.empty()
-    while True:
-        for fig in all_figs:
-            with placeholder.container():
-                st.plotly_chart(fig)
-                time.sleep(3)
+
+    return [initial_stage, transformed_stage, inverse_transform_stage, inverse_transformed_stage]
+
+def build_interpolation(grid_obj: tc.Grid) -> go.Figure:
+
+    initial_basis_obj = InitialBasis()
+    transformed_basis_obj = TransformedBasis()
+    inverse_transform_basis_obj = InverseTransformBasis(transformed_basis_obj.basis)
+
+    # the grid morphs from I to T and on to T^-1, every frame is computed up front in one pass.
+    interpolation_fig = grid_obj.plot_interpolation(
+        [initial_basis_obj, transformed_basis_obj, inverse_transform_basis_obj], initial_basis_obj.grid,
+        "04-interpolated_grid.html", ["I", "I * T", "I * T^-1"], cfg.INTERPOLATION_STEPS, cfg.INTERPOLATION_FRAME_DURATION
+    )
+
+    return interpolation_fig
+
+# the grid settings, export, streamlit app and command line shared with the other visualizations.
+app = tc.StageApp(cfg, compute_stages, build_interpolation, __doc__)
+
+if __name__ == "__main__":
+    app.main()
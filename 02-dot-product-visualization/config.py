@@ -4,6 +4,19 @@ import numpy as np
 GRID_SIZE = 5
 GRID_SPACING = 1
 
+# rendering ("lines", "packed" or "webgl", see transform_core.grid)
+RENDER_MODE = "lines"
+
+# export ("standalone", "shared" or "json", see transform_core.export), combined puts every stage in one HTML file
+EXPORT_MODE = "standalone"
+EXPORT_COMBINED = None
+
+# worker processes of the parallel export (--export, --batch-export), None is one per core
+EXPORT_WORKERS = None
+
+# animation (milliseconds each stage is shown for)
+FRAME_DURATION = 3000
+
 # vectors
 INITIAL_VECTOR = np.array([1, 2])
 INITIAL_BASIS = np.array([[1, 0], [0, 1]])
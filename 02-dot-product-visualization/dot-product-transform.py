@@ -1,100 +1,15 @@
-import time
+""" Dot product as a 2D to 1D transformation, served as a Streamlit app or computed / exported headless """
+
+import sys
+import pathlib
 import numpy as np
 import config as cfg
-import streamlit as st
-import plotly.graph_objs as go
 
-class Grid():
+# the shared transform core lives at the root of the repository.
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+import transform_core as tc
 
-    def __init__(self) -> None:
-        pass
-
-    def plot_basis(self, basis: np.ndarray, fig: go.Figure, vector: np.ndarray=None) -> go.Figure:
-        annotation = []
-        for index, bais_vector in enumerate(basis):
-            annotation.append(
-                go.layout.Annotation(
-                    {
-                        "x": bais_vector[0],
-                        "y": bais_vector[1],
-                        "xref": "x",
-                        "yref": "y",
-                        "axref": "x",
-                        "ayref": "y",
-                        "ax": 0,
-                        "ay": 0,
-                        "arrowhead": 5,
-                        "arrowwidth": 3,
-                        "arrowcolor": cfg.BASIS_COLORS[index]
-                    }
-                )
-            )
-        if vector is not None:
-            annotation.append(
-                go.layout.Annotation(
-                    {
-                        "x": vector[0],
-                        "y": vector[1],
-                        "xref": "x",
-                        "yref": "y",
-                        "axref": "x",
-                        "ayref": "y",
-                        "ax": 0,
-                        "ay": 0,
-                        "arrowhead": 5,
-                        "arrowwidth": 3,
-                        "arrowcolor": cfg.VECTOR_COLOR
-                    }
-                )
-            )
-        fig.update_layout(annotations=annotation)
-        return fig
-        
-    def plot_grid(self, basis: np.ndarray, grid: np.ndarray, name: str, extra: list[float, np.ndarray]=None) -> go.Figure:
-        x_traces = []
-        y_traces = []
-        for index in range(1, grid.shape[0]-1, 1):
-            x_traces.append(
-                go.Scatter(
-                    x=grid[index, :, 0], y=grid[index, :, 1], mode="lines+markers",
-                    hovertemplate="(%{x}, %{y})<extra></extra>", marker_color=cfg.GRID_COLOR
-                )
-            )
-        for index in range(1, grid.shape[1]-1, 1):
-            y_traces.append(
-                go.Scatter(
-                    x=grid[:, index, 0], y=grid[:, index, 1], mode="lines+markers",
-                    hovertemplate="(%{x}, %{y})<extra></extra>", marker_color=cfg.GRID_COLOR
-                )
-            )
-        fig = go.Figure(x_traces + y_traces)
-
-        if name.split("-")[0] == "00":
-            plot_title = "Initial Grid"
-        elif name.split("-")[0] == "01":
-            plot_title = "Transformed Grid"
-        elif name.split("-")[0] == "02":
-            plot_title = "Transformed Grid in Original Grid with random incline"
-        else:
-            plot_title = f"Dot of [1, 2]^T and [2, 1]^T = {extra[0]}"
-
-        fig.update_layout(
-            title=plot_title,
-            xaxis_title="X axis",
-            yaxis_title="Y axis",
-            showlegend=False,
-            template="plotly_dark",
-            yaxis={"range": [-cfg.GRID_SIZE, cfg.GRID_SIZE]},
-            xaxis={"range": [-cfg.GRID_SIZE, cfg.GRID_SIZE]}
-        )
-        if extra is not None:
-            fig = self.plot_basis(basis, fig, extra[1])
-        else:
-            fig = self.plot_basis(basis, fig)
-        fig.write_html(name)
-        return fig
-    
-class InitialBasis():
+class InitialBasis(tc.InitialBasis):
 
     def __init__(self) -> None:
         """
@@ -105,13 +20,9 @@ class InitialBasis():
         """
         # basis vectors are represented in a list one after the other for ease of coding.
         # here it looks same as the basis matrix.
-        self.basis = cfg.INITIAL_BASIS
-        self.grid_cords = np.arange(-cfg.GRID_SIZE, cfg.GRID_SIZE+1, cfg.GRID_SPACING)
-        self.grid = np.asarray(
-            [[x_cord, y_cord] for y_cord in self.grid_cords for x_cord in self.grid_cords]
-            ).reshape((2*cfg.GRID_SIZE+1, 2*cfg.GRID_SIZE+1, 2))
-        
-class TransformBasis():
+        super().__init__(cfg.INITIAL_BASIS, cfg.GRID_SIZE, cfg.GRID_SPACING)
+
+class TransformBasis(tc.Basis):
 
     def __init__(self) -> None:
         """
@@ -123,13 +34,10 @@ class TransformBasis():
         """
         # basis vectors are represented in a list one after the other for easy of coding.
         # now to make the 2D grid, the transformation matrix was changed to [[1, 0], [2, 0]], so that all y cordinated will be zero (2D --> 1D).
-        # here the transpose will be the correct matrix representation of these basis vectors (see line 108).
-        self.basis = cfg.TRANSFORM_BASIS
+        # here the transpose will be the correct matrix representation of these basis vectors (see tc.Basis.matrix).
+        super().__init__(cfg.TRANSFORM_BASIS)
 
-    def perform_transformation(self, vector: np.ndarray) -> np.ndarray:
-        return np.matmul(np.transpose(self.basis), vector)
-    
-class TranformBasisAsOriginal():
+class TranformBasisAsOriginal(tc.Basis):
 
     def __init__(self) -> None:
         """
@@ -141,16 +49,17 @@ class TranformBasisAsOriginal():
         --> Essentially, the transformed grid is put on this line.
         """
         # basis vectors are represented in a list one after the other for easy of coding.
-        # here the transpose will be the correct matrix representation of these basis vectors (see line 124).
-        self.basis = cfg.TRANSFORM_BASIS_AS_ORIGINAL
+        # here the transpose will be the correct matrix representation of these basis vectors (see tc.Basis.matrix).
+        super().__init__(cfg.TRANSFORM_BASIS_AS_ORIGINAL)
 
     def place_in_2dgrid(self, vector: np.ndarray) -> np.ndarray:
-        return np.matmul(np.transpose(self.basis), vector)
-
-    
-if __name__ == "__main__":
+        return self.perform_transformation(vector)
 
-    grid_obj = Grid()
+def compute_stages() -> list[dict]:
+    """
+    --> The basis, grid, file name, title (and vector) of every stage, as keyword arguments of tc.Grid.plot_grid.
+    --> Only numpy is needed here, nothing is rendered.
+    """
     initial_basis_obj = InitialBasis()
     transformed_basis_obj = TransformBasis()
     tranformed_basis_as_original_obj = TranformBasisAsOriginal()
@@ -160,8 +69,10 @@ if __name__ == "__main__":
     # ORIGINAL GRID
     # ========================================================================================================
 
-    # ploting initial basis
-    initial_grid_fig = grid_obj.plot_grid(initial_basis_obj.basis, initial_basis_obj.grid, "00-initial_basis.html")
+    initial_stage = {
+        "basis": initial_basis_obj.basis, "grid": initial_basis_obj.grid, "name": "00-initial_basis.html",
+        "title": "Initial Grid"
+    }
 
 
     # ========================================================================================================
@@ -169,18 +80,12 @@ if __name__ == "__main__":
     # ========================================================================================================
 
     # calculating transformation by the new basis
-    transformed_cords = []
-    for line_cords in initial_basis_obj.grid:
-        for cords in line_cords:
-            transformed_cords.append(
-                transformed_basis_obj.perform_transformation(
-                    cords.reshape((-1, 1))
-                ).reshape(1, -1)
-            )
-    transformed_grid = np.asarray(transformed_cords).reshape((2*cfg.GRID_SIZE+1, 2*cfg.GRID_SIZE+1, 2))
+    transformed_grid = transformed_basis_obj.perform_batch_transformation(initial_basis_obj.grid)
 
-    # plotting the new basis
-    transformed_grid_fig = grid_obj.plot_grid(transformed_basis_obj.basis, transformed_grid, "01-transformed_grid.html")
+    transformed_stage = {
+        "basis": transformed_basis_obj.basis, "grid": transformed_grid, "name": "01-transformed_grid.html",
+        "title": "Transformed Grid"
+    }
 
 
     # ========================================================================================================
@@ -188,18 +93,12 @@ if __name__ == "__main__":
     # ========================================================================================================
 
     # calculating transformation to place it on a line in original grid
-    replaced_cords = []
-    for line_cords in initial_basis_obj.grid:
-        for cords in line_cords:
-            replaced_cords.append(
-                tranformed_basis_as_original_obj.place_in_2dgrid(
-                    cords.reshape((-1, 1))
-                ).reshape(1, -1)
-            )
-    replaced_grid = np.asarray(replaced_cords).reshape((2*cfg.GRID_SIZE+1, 2*cfg.GRID_SIZE+1, 2))
+    replaced_grid = tranformed_basis_as_original_obj.perform_batch_transformation(initial_basis_obj.grid)
 
-    # plotting the new basis
-    replaced_grid_fig = grid_obj.plot_grid(tranformed_basis_as_original_obj.basis, replaced_grid, "02-replaced_grid.html")
+    replaced_stage = {
+        "basis": tranformed_basis_as_original_obj.basis, "grid": replaced_grid, "name": "02-replaced_grid.html",
+        "title": "Transformed Grid in Original Grid with random incline"
+    }
 
 
     # ========================================================================================================
@@ -215,19 +114,19 @@ if __name__ == "__main__":
     # calculating transformation to place it on a line in original grid
     transformed_vector = tranformed_basis_as_original_obj.place_in_2dgrid(vector.reshape(-1, 1)).reshape(-1)
 
-    extras = [dot_product, transformed_vector]
-
-    # plotting the new basis
-    replaced_vector_grid_fig = grid_obj.plot_grid(tranformed_basis_as_original_obj.basis, replaced_grid, "03-dot_and_transform.html", extras)
+    replaced_vector_stage = {
+        "basis": tranformed_basis_as_original_obj.basis, "grid": replaced_grid, "name": "03-dot_and_transform.html",
+        "title": f"Dot of {tc.matrix_label(cfg.INITIAL_VECTOR)}^T and {tc.matrix_label(vector)}^T = {dot_product}",
+        "vector": transformed_vector
+    }
 
 
     # ========================================================================================================
-    
-    all_figs = [initial_grid_fig, transformed_grid_fig, replaced_grid_fig, replaced_vector_grid_fig]
-
-    placeholder = st.empty()
-    while True:
-        for fig in all_figs:
-            with placeholder.container():
-                st.plotly_chart(fig)
-                time.sleep(3)
+
+    return [initial_stage, transformed_stage, replaced_stage, replaced_vector_stage]
+
+# the grid settings, export, streamlit app and command line shared with the other visualizations.
+app = tc.StageApp(cfg, compute_stages, description=__doc__)
+
+if __name__ == "__main__":
+    app.main()
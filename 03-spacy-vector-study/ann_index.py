@@ -0,0 +1,128 @@
+""" Approximate nearest neighbour (IVF) index over normalized word vectors, pure numpy """
+
+import time
+import numpy as np
+
+from similarity import WordSimilarity, normalize, top_k_columns
+
+class IVFIndex():
+
+    def __init__(self, n_lists: int=256, n_probe: int=8, seed: int=0) -> None:
+        """
+        --> Inverted file index: the vectors are split into n_lists clusters by spherical k-means.
+        --> A query is only scored against the vectors of the n_probe clusters whose centroids are closest to it.
+        --> So a query costs n_lists + about V * n_probe / n_lists dot products instead of V.
+        --> More probes means better recall and slower queries, see recall_at_k to pick the trade-off.
+        """
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.seed = seed
+        self.centroids = None
+        self.vectors = None
+        self.ids = None
+        self.offsets = None
+
+    def _assign(self, vectors: np.ndarray, chunk_size: int=8192) -> np.ndarray:
+        assignment = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk_size):
+            assignment[start:start+chunk_size] = np.argmax(
+                np.matmul(vectors[start:start+chunk_size], self.centroids.T), axis=1
+            )
+        return assignment
+
+    def build(self, vectors: np.ndarray, iterations: int=10, sample_size: int=100_000) -> "IVFIndex":
+        """
+        --> Trains the centroids on a sample of at most sample_size vectors, then files every vector under its closest one.
+        --> Vectors are stored sorted by cluster, so every inverted list is one contiguous slice.
+        """
+        vectors = normalize(vectors)
+        rng = np.random.default_rng(self.seed)
+        self.n_lists = min(self.n_lists, len(vectors))
+        sample = vectors[rng.choice(len(vectors), min(sample_size, len(vectors)), replace=False)]
+
+        self.centroids = sample[rng.choice(len(sample), self.n_lists, replace=False)]
+        for _ in range(iterations):
+            assignment = self._assign(sample)
+            sums = np.zeros_like(self.centroids)
+            np.add.at(sums, assignment, sample)
+            counts = np.bincount(assignment, minlength=self.n_lists)
+            # an empty cluster is reseeded with a random sample vector, so no list stays unused.
+            empty = counts == 0
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            self.centroids = normalize(sums)
+
+        assignment = self._assign(vectors)
+        order = np.argsort(assignment, kind="stable")
+        self.ids = order
+        self.vectors = vectors[order]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=self.n_lists))])
+        return self
+
+    def batch_query(self, queries: np.ndarray, k: int=10, n_probe: int=None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        --> The approximate k nearest rows of every query, returns (ids, similarities) of shape (Q, k).
+        --> Work is grouped by inverted list, every list is scored against all the queries probing it in one matmul.
+        --> Slots that could not be filled (fewer than k candidates probed) hold id -1 and similarity -inf.
+        """
+        n_probe = min(n_probe if n_probe is not None else self.n_probe, self.n_lists)
+        queries = normalize(np.atleast_2d(queries))
+        probes = np.argpartition(-np.matmul(queries, self.centroids.T), n_probe-1, axis=1)[:, :n_probe]
+
+        best_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for list_id in np.unique(probes):
+            query_rows = np.flatnonzero((probes == list_id).any(axis=1))
+            start, end = self.offsets[list_id], self.offsets[list_id+1]
+            if start == end:
+                continue
+            scores = np.matmul(queries[query_rows], self.vectors[start:end].T)
+            ids = np.broadcast_to(self.ids[start:end], scores.shape)
+            best_ids[query_rows], best_scores[query_rows] = top_k_columns(
+                np.concatenate([best_scores[query_rows], scores], axis=1), k,
+                np.concatenate([best_ids[query_rows], ids], axis=1)
+            )
+        return best_ids, best_scores
+
+    def query(self, vector: np.ndarray, k: int=10, n_probe: int=None) -> tuple[np.ndarray, np.ndarray]:
+        ids, scores = self.batch_query(vector, k, n_probe)
+        return ids[0], scores[0]
+
+    def save(self, path: str) -> None:
+        # through a file handle, np.savez would otherwise append .npz to a path without it and load(path) would miss it.
+        with open(path, "wb") as index_file:
+            np.savez(
+                index_file, centroids=self.centroids, vectors=self.vectors, ids=self.ids, offsets=self.offsets,
+                settings=np.array([self.n_lists, self.n_probe, self.seed])
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        with np.load(path) as saved:
+            n_lists, n_probe, seed = saved["settings"].tolist()
+            index = cls(n_lists, n_probe, seed)
+            index.centroids = saved["centroids"]
+            index.vectors = saved["vectors"]
+            index.ids = saved["ids"]
+            index.offsets = saved["offsets"]
+        return index
+
+def recall_at_k(index: IVFIndex, vectors: np.ndarray, queries: np.ndarray, k: int=10, n_probes: list[int]=None) -> list[dict]:
+    """
+    --> Compares the index against exact brute force search (WordSimilarity.top_k) over the same vectors.
+    --> For every n_probe: the fraction of the true k nearest neighbours found, and the time of both searches.
+    """
+    exact = WordSimilarity([str(row) for row in range(len(vectors))], vectors)
+    start = time.perf_counter()
+    exact_ids, _ = exact.top_k(queries, k)
+    exact_time = time.perf_counter() - start
+
+    report = []
+    for n_probe in (n_probes if n_probes is not None else [1, 2, 4, 8, 16, 32]):
+        start = time.perf_counter()
+        ids, _ = index.batch_query(queries, k, n_probe)
+        ann_time = time.perf_counter() - start
+        found = sum(len(np.intersect1d(row, exact_row)) for row, exact_row in zip(ids, exact_ids))
+        report.append({
+            "n_probe": n_probe, "recall": found / exact_ids.size, "ann_time": ann_time, "exact_time": exact_time
+        })
+    return report
@@ -0,0 +1,135 @@
+""" Streams word pairs from a file and writes their cosine similarity chunk by chunk (CSV or Parquet) """
+
+import os
+import csv
+import sys
+import time
+import argparse
+import itertools
+import numpy as np
+
+from collections import OrderedDict
+from similarity import WordSimilarity, embed
+
+def read_pairs(path: str, delimiter: str=","):
+    # one "word_1<delimiter>word_2" pair per line, read lazily so the file is never held in memory.
+    with open(path, newline="", encoding="utf-8") as pairs_file:
+        for row in csv.reader(pairs_file, delimiter=delimiter):
+            if len(row) >= 2:
+                yield row[0], row[1]
+
+def chunked(iterable, size: int):
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+class SimilarityWriter():
+
+    def __init__(self, path: str, output_format: str=None) -> None:
+        """
+        --> Appends every chunk of results to the output as soon as it is computed, nothing is kept in memory.
+        --> The format is taken from the file suffix unless given, Parquet needs pyarrow installed.
+        """
+        self.output_format = output_format or ("parquet" if path.endswith(".parquet") else "csv")
+        self.path = path
+        if self.output_format == "parquet":
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError as error:
+                raise ImportError("writing parquet needs pyarrow, pip install pyarrow or write a .csv file") from error
+            self._pa = pa
+            self._writer = pq.ParquetWriter(path, pa.schema(
+                [("word_1", pa.string()), ("word_2", pa.string()), ("cosine_similarity", pa.float32())]
+            ))
+        else:
+            self._file = open(path, "w", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(["word_1", "word_2", "cosine_similarity"])
+
+    def write(self, words_1: list[str], words_2: list[str], similarities: np.ndarray) -> None:
+        if self.output_format == "parquet":
+            self._writer.write_table(self._pa.table(
+                {"word_1": words_1, "word_2": words_2, "cosine_similarity": similarities.astype(np.float32)}
+            ))
+        else:
+            self._writer.writerows(zip(words_1, words_2, similarities.tolist()))
+
+    def close(self) -> None:
+        if self.output_format == "parquet":
+            self._writer.close()
+        else:
+            self._file.close()
+
+    def __enter__(self) -> "SimilarityWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+def similarity_chunks(
+    nlp, pairs, chunk_size: int=100_000, batch_size: int=1000, n_process: int=1,
+    min_parallel_words: int=10_000, cache_words: int=500_000
+):
+    """
+    --> Yields (words_1, words_2, similarities) for every chunk_size pairs read from pairs.
+    --> Only the words of a chunk that were not seen recently are embedded, through nlp.pipe with n_process workers.
+    --> Starting the worker processes costs seconds, so chunks with fewer than min_parallel_words new words stay in process.
+    --> Vectors of the last cache_words words are kept (least recently used out), so memory stays flat.
+    --> They are copied into one (cache_words, D) buffer, a cached word never holds on to the chunk it was embedded in.
+    --> All the pairs of a chunk are then scored in one vectorized call.
+    """
+    slots, buffer = OrderedDict(), None
+    for chunk in chunked(pairs, chunk_size):
+        words_1, words_2 = (list(words) for words in zip(*chunk))
+        words = list(dict.fromkeys(words_1 + words_2))
+        cached = np.fromiter((word in slots for word in words), dtype=bool, count=len(words))
+        missing = [word for word, is_cached in zip(words, cached) if not is_cached]
+        if missing:
+            processes = n_process if len(missing) >= min_parallel_words else 1
+            embedded = embed(nlp, missing, batch_size, processes)
+            if buffer is None:
+                buffer = np.empty((cache_words, embedded.shape[1]), dtype=np.float32)
+
+        vectors = np.empty((len(words), buffer.shape[1]), dtype=np.float32)
+        vectors[cached] = buffer[[slots[word] for word, is_cached in zip(words, cached) if is_cached]]
+        for word, is_cached in zip(words, cached):
+            if is_cached:
+                slots.move_to_end(word)
+        if missing:
+            vectors[~cached] = embedded
+            # only the last cache_words new words can stay, each takes a free slot or the least recently used one.
+            keep_from = max(len(missing) - cache_words, 0)
+            for word, vector in zip(missing[keep_from:], embedded[keep_from:]):
+                slot = len(slots) if len(slots) < cache_words else slots.popitem(last=False)[1]
+                slots[word] = slot
+                buffer[slot] = vector
+
+        yield words_1, words_2, WordSimilarity(words, vectors).similarity(words_1, words_2)
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("pairs", help="input file with one word pair per line")
+    parser.add_argument("output", help="output .csv or .parquet file")
+    parser.add_argument("--model", default="en_core_web_sm")
+    parser.add_argument("--delimiter", default=",")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="nlp.pipe worker processes")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="pairs scored per vectorized chunk")
+    parser.add_argument("--batch-size", type=int, default=1000, help="nlp.pipe batch size")
+    parser.add_argument("--format", choices=["csv", "parquet"], default=None)
+    args = parser.parse_args()
+
+    import spacy
+    spacy_nlp = spacy.load(args.model)
+
+    start = time.perf_counter()
+    total_pairs = 0
+    with SimilarityWriter(args.output, args.format) as writer:
+        for words_1, words_2, similarities in similarity_chunks(
+            spacy_nlp, read_pairs(args.pairs, args.delimiter), args.chunk_size, args.batch_size, args.processes
+        ):
+            writer.write(words_1, words_2, similarities)
+            total_pairs += len(similarities)
+            elapsed = time.perf_counter() - start
+            print(f"{total_pairs} pairs in {elapsed:.1f}s ({total_pairs/elapsed:.0f} pairs/s)", file=sys.stderr)
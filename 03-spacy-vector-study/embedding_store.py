@@ -0,0 +1,156 @@
+""" Persistent memory-mapped cache of word vectors, keyed by spaCy model name and version """
+
+import os
+import json
+import numpy as np
+
+from importlib import metadata
+from similarity import embed
+
+def model_version(model_name: str) -> str:
+    # read from the installed package metadata, so the pipeline is not loaded just to know its version.
+    try:
+        return metadata.version(model_name)
+    except metadata.PackageNotFoundError:
+        return "unversioned"
+
+class EmbeddingStore():
+
+    def __init__(
+        self, cache_dir: str, model_name: str, max_rows: int=100_000, nlp=None, batch_size: int=1000
+    ) -> None:
+        """
+        --> Vectors live in <cache_dir>/<model>-<version>/vectors.npy, a memory-mapped (max_rows, D) float32 array.
+        --> index.json maps every cached token to its row, last_used.npy holds when each row was last read.
+        --> Words already in the cache are served from the memory map, spaCy is not even imported for them.
+        --> The pipeline is loaded lazily on the first cache miss, and only the missing words are embedded.
+        --> Once all max_rows rows are taken, the least recently used rows are evicted to make room.
+        --> max_rows is fixed when the cache is first created, delete the directory to resize it.
+        --> The index is saved after every insert, and before any evicted row is overwritten, so an interrupted run
+        --> never leaves index.json pointing a word at another word's vector.
+        """
+        self.model_name = model_name
+        self.model_version = model_version(model_name)
+        self.path = os.path.join(cache_dir, f"{model_name}-{self.model_version}")
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+        self._nlp = nlp
+
+        self._vectors = None
+        self._rows = {}
+        self._clock = 0
+        self.max_rows = max_rows
+        self._last_used = np.full(max_rows, -1, dtype=np.int64)
+        if os.path.exists(self._file("index.json")):
+            self._load()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _load(self) -> None:
+        with open(self._file("index.json")) as index_file:
+            index = json.load(index_file)
+        self._rows = index["rows"]
+        self._clock = index["clock"]
+        self._vectors = np.lib.format.open_memmap(self._file("vectors.npy"), mode="r+")
+        self.max_rows = len(self._vectors)
+        self._last_used = np.load(self._file("last_used.npy"))
+
+    @property
+    def nlp(self):
+        if self._nlp is None:
+            import spacy
+            self._nlp = spacy.load(self.model_name)
+        return self._nlp
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._rows
+
+    def _allocate(self, dim: int) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        self._vectors = np.lib.format.open_memmap(
+            self._file("vectors.npy"), mode="w+", dtype=np.float32, shape=(self.max_rows, dim)
+        )
+
+    def _free_rows(self, count: int, keep: set[int]) -> np.ndarray:
+        # never used rows first, then the least recently used ones that the current request does not need.
+        candidates = np.argsort(self._last_used, kind="stable")
+        if keep:
+            candidates = candidates[~np.isin(candidates, list(keep))]
+        if len(candidates) < count:
+            raise ValueError(f"{count} new words do not fit in a cache of {self.max_rows} rows")
+        rows = candidates[:count]
+
+        # a row belongs to the index whatever last_used says, it may have been saved before its first read.
+        evicted = set(rows.tolist()) & set(self._rows.values())
+        if evicted:
+            self._rows = {word: row for word, row in self._rows.items() if row not in evicted}
+            # the evicted words leave the saved index before their rows are overwritten.
+            self._save_index()
+        return rows
+
+    def _insert(self, words: list[str], keep: set[int]) -> None:
+        # rows are picked before embedding, so a request that can not fit fails without loading the pipeline.
+        rows = self._free_rows(len(words), keep)
+        vectors = embed(self.nlp, words, self.batch_size)
+        if self._vectors is None:
+            self._allocate(vectors.shape[1])
+        self._vectors[rows] = vectors
+        self._vectors.flush()
+        self._rows.update(zip(words, rows.tolist()))
+        self._save_index()
+
+    def vectors(self, words: list[str]) -> np.ndarray:
+        """
+        --> (len(words), D) float32 vectors of the words, embedding and caching only the ones not seen before.
+        """
+        words = list(words)
+        if not words:
+            # D is only known once the first vectors are stored, before that the result is (0, 0).
+            return np.empty((0, 0 if self._vectors is None else self._vectors.shape[1]), dtype=np.float32)
+        missing = [word for word in dict.fromkeys(words) if word not in self._rows]
+        self.misses += len(missing)
+        self.hits += len(words) - len(missing)
+        if missing:
+            keep = {self._rows[word] for word in words if word in self._rows}
+            self._insert(missing, keep)
+
+        rows = np.fromiter((self._rows[word] for word in words), dtype=np.int64, count=len(words))
+        self._clock += 1
+        self._last_used[rows] = self._clock
+        return np.asarray(self._vectors[rows])
+
+    def vector(self, word: str) -> np.ndarray:
+        # a copy, a view into the memory map would change under the caller once its row is evicted and reused.
+        if word not in self._rows:
+            return self.vectors([word])[0]
+        self._clock += 1
+        self._last_used[self._rows[word]] = self._clock
+        return np.array(self._vectors[self._rows[word]])
+
+    def _save_index(self) -> None:
+        # written to temporary files and moved into place, a crash leaves either the old or the new index.
+        if self._vectors is None:
+            return
+        with open(self._file("last_used.npy.tmp"), "wb") as last_used_file:
+            np.save(last_used_file, self._last_used)
+        with open(self._file("index.json.tmp"), "w") as index_file:
+            json.dump({"model": self.model_name, "version": self.model_version, "clock": self._clock, "rows": self._rows}, index_file)
+        os.replace(self._file("last_used.npy.tmp"), self._file("last_used.npy"))
+        os.replace(self._file("index.json.tmp"), self._file("index.json"))
+
+    def flush(self) -> None:
+        if self._vectors is None:
+            return
+        self._vectors.flush()
+        self._save_index()
+
+    def __enter__(self) -> "EmbeddingStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.flush()
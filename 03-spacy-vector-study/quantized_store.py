@@ -0,0 +1,96 @@
+""" Compact float16 / int8 storage of word vectors with a similarity kernel on the quantized rows """
+
+import numpy as np
+
+from similarity import WordSimilarity, top_k_columns
+
+QUANTIZED_DTYPES = ("float16", "int8")
+
+class QuantizedVectors():
+
+    def __init__(self, vectors: np.ndarray, dtype: str="int8") -> None:
+        """
+        --> int8: every row is stored as round(v / scale) with scale = max(|v|) / 127 kept per row (4x smaller than float32).
+        --> float16: every row is stored as is in half precision (2x smaller than float32), no scale is needed.
+        --> The inverse norm of every stored row is computed here once, it is the only per row value the kernels need.
+        --> Cosine similarity does not depend on the scale of a row, so the kernel works on the stored rows directly:
+        --> cos(i, j) = (q_i . q_j) / (|q_i| |q_j|), no row is ever turned back into float32 vectors for it.
+        """
+        if dtype not in QUANTIZED_DTYPES:
+            raise ValueError(f"dtype must be one of {QUANTIZED_DTYPES}, got {dtype}")
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.dtype = dtype
+
+        if dtype == "int8":
+            self.scales = (np.abs(vectors).max(axis=1) / 127).astype(np.float32)
+            safe_scales = np.where(self.scales > 0, self.scales, 1)[:, None]
+            self.data = np.rint(vectors / safe_scales).astype(np.int8)
+        else:
+            self.scales = None
+            self.data = vectors.astype(np.float16)
+
+        stored_norms = np.linalg.norm(self.data.astype(np.float32), axis=1)
+        # zero rows keep a zero inverse norm, so their similarity to anything is 0.
+        self.inverse_norms = np.divide(
+            1, stored_norms, out=np.zeros_like(stored_norms), where=stored_norms > 0
+        ).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def nbytes(self) -> int:
+        scale_bytes = self.scales.nbytes if self.scales is not None else 0
+        return self.data.nbytes + scale_bytes + self.inverse_norms.nbytes
+
+    def _block(self, rows) -> np.ndarray:
+        # int8 products summed over a few hundred dimensions stay exact in float32, so BLAS can be used.
+        return self.data[rows].astype(np.float32)
+
+    def dequantize(self, rows=slice(None)) -> np.ndarray:
+        return self._block(rows) * self.scales[rows, None] if self.dtype == "int8" else self._block(rows)
+
+    def similarity(self, rows_1: np.ndarray, rows_2: np.ndarray) -> np.ndarray:
+        # cosine similarity of every (rows_1[i], rows_2[i]) pair.
+        dots = np.einsum("ij,ij->i", self._block(rows_1), self._block(rows_2))
+        return dots * self.inverse_norms[rows_1] * self.inverse_norms[rows_2]
+
+    def top_k(self, query_rows: np.ndarray, k: int=10, chunk_size: int=512) -> tuple[np.ndarray, np.ndarray]:
+        """
+        --> The k most similar rows of every query row, scored chunk by chunk of the stored rows.
+        """
+        queries = self._block(query_rows) * self.inverse_norms[query_rows, None]
+        k = min(k, len(self))
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, len(self), chunk_size):
+            block = slice(start, start+chunk_size)
+            scores = np.matmul(queries, self._block(block).T) * self.inverse_norms[block]
+            candidates = np.concatenate([best_scores, scores], axis=1)
+            candidate_rows = np.concatenate(
+                [best_rows, np.broadcast_to(np.arange(start, start+scores.shape[1]), scores.shape)], axis=1
+            )
+            best_rows, best_scores = top_k_columns(candidates, k, candidate_rows)
+        return best_rows, best_scores
+
+def quantization_report(vectors: np.ndarray, pairs: int=100_000, seed: int=0) -> list[dict]:
+    """
+    --> Memory of the float32 vectors against each quantized store, and the cosine similarity error they introduce.
+    --> The error is measured over random pairs against the float32 similarity of cosine_sim (via WordSimilarity).
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    rows_1, rows_2 = rng.integers(0, len(vectors), (2, pairs))
+
+    exact = WordSimilarity(range(len(vectors)), vectors)
+    reference = np.einsum("ij,ij->i", exact.vectors[rows_1], exact.vectors[rows_2])
+
+    report = [{"dtype": "float32", "bytes": vectors.nbytes, "ratio": 1.0, "max_error": 0.0, "mean_error": 0.0}]
+    for dtype in QUANTIZED_DTYPES:
+        quantized = QuantizedVectors(vectors, dtype)
+        error = np.abs(quantized.similarity(rows_1, rows_2) - reference)
+        report.append({
+            "dtype": dtype, "bytes": quantized.nbytes, "ratio": vectors.nbytes / quantized.nbytes,
+            "max_error": float(error.max()), "mean_error": float(error.mean())
+        })
+    return report
@@ -0,0 +1,88 @@
+""" Batched cosine similarity over a whole word list with a single matrix multiply """
+
+import numpy as np
+
+def embed(nlp, words: list[str], batch_size: int=1000, n_process: int=1) -> np.ndarray:
+    # every word goes through one nlp.pipe stream instead of a separate nlp(word) call each.
+    vectors = [doc.vector for doc in nlp.pipe(words, batch_size=batch_size, n_process=n_process)]
+    return np.asarray(vectors, dtype=np.float32).reshape(len(words), -1)
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """
+    --> Scales every row to unit length, so the dot of two rows is their cosine similarity.
+    --> Rows that are all zeros are left as zeros (similarity 0 rather than the nan of cosine_sim).
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+def top_k_columns(scores: np.ndarray, k: int, ids: np.ndarray=None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    --> The k highest scores of every row, most similar first, along with their columns (or ids[row, column]).
+    --> argpartition finds them without sorting the whole row, only the k kept scores are sorted.
+    """
+    k = min(k, scores.shape[1])
+    best = np.argpartition(-scores, k-1, axis=1)[:, :k]
+    best_scores = np.take_along_axis(scores, best, axis=1)
+    order = np.argsort(-best_scores, axis=1)
+    best = np.take_along_axis(best, order, axis=1)
+    if ids is not None:
+        best = np.take_along_axis(ids, best, axis=1)
+    return best, np.take_along_axis(best_scores, order, axis=1)
+
+class WordSimilarity():
+
+    def __init__(self, words: list[str], vectors: np.ndarray) -> None:
+        """
+        --> Holds the pre-normalized float32 (V, D) matrix of the word vectors, one row per word.
+        --> Norms are computed once here, so every similarity afterwards is a plain dot product.
+        """
+        self.words = list(words)
+        self.index = {word: row for row, word in enumerate(self.words)}
+        self.vectors = normalize(vectors)
+
+    @classmethod
+    def from_nlp(cls, nlp, words: list[str], batch_size: int=1000) -> "WordSimilarity":
+        words = list(dict.fromkeys(words))
+        return cls(words, embed(nlp, words, batch_size))
+
+    def rows(self, words: list[str]) -> np.ndarray:
+        return np.fromiter((self.index[word] for word in words), dtype=np.int64, count=len(words))
+
+    def similarity(self, words_1: list[str], words_2: list[str]) -> np.ndarray:
+        # cosine similarity of every (words_1[i], words_2[i]) pair, row wise dot products in one call.
+        return np.einsum("ij,ij->i", self.vectors[self.rows(words_1)], self.vectors[self.rows(words_2)])
+
+    def pairwise_chunks(self, chunk_size: int=512):
+        """
+        --> Yields (start, block) with block = vectors[start:start+chunk_size] @ vectors^T.
+        --> Only a (chunk_size, V) block is in memory at a time, which bounds memory for 100k+ word vocabularies.
+        """
+        for start in range(0, len(self.words), chunk_size):
+            yield start, np.matmul(self.vectors[start:start+chunk_size], self.vectors.T)
+
+    def pairwise(self, chunk_size: int=512) -> np.ndarray:
+        # the full (V, V) similarity matrix, only sensible when V^2 float32 values fit in memory.
+        matrix = np.empty((len(self.words), len(self.words)), dtype=np.float32)
+        for start, block in self.pairwise_chunks(chunk_size):
+            matrix[start:start+len(block)] = block
+        return matrix
+
+    def top_k(self, queries: np.ndarray, k: int=10, chunk_size: int=512) -> tuple[np.ndarray, np.ndarray]:
+        """
+        --> The k most similar vocabulary rows of every query vector, most similar first.
+        --> Queries are scored chunk by chunk against the whole vocabulary, argpartition avoids a full sort.
+        --> Returns (rows, similarities), both of shape (Q, k).
+        """
+        queries = normalize(np.atleast_2d(queries))
+        k = min(k, len(self.words))
+        rows = np.empty((len(queries), k), dtype=np.int64)
+        similarities = np.empty((len(queries), k), dtype=np.float32)
+        for start in range(0, len(queries), chunk_size):
+            scores = np.matmul(queries[start:start+chunk_size], self.vectors.T)
+            rows[start:start+len(scores)], similarities[start:start+len(scores)] = top_k_columns(scores, k)
+        return rows, similarities
+
+    def neighbours(self, word: str, k: int=10) -> list[tuple[str, float]]:
+        rows, similarities = self.top_k(self.vectors[self.index[word]], k)
+        return [(self.words[row], float(similarity)) for row, similarity in zip(rows[0], similarities[0])]
@@ -1,29 +1,29 @@
-import spacy
 import numpy as np
 
 from prettytable import PrettyTable
+from similarity import WordSimilarity
+from embedding_store import EmbeddingStore
 
 def cosine_sim(vector_1: np.ndarray, vector_2: np.ndarray) -> np.float32:
     return np.dot(vector_1, vector_2)/(np.linalg.norm(vector_1)*np.linalg.norm(vector_2))
 
 if __name__ == "__main__":
-    spacy_nlp = spacy.load("en_core_web_sm")
-    banana_vec = spacy_nlp("banana").vector
-    banAna_vec = spacy_nlp("banAna").vector
-    apple_vec = spacy_nlp("apple").vector
-    torpedo_vec = spacy_nlp("torpedo").vector
-    
+    word_pairs = [
+        ("banana", "banana"), ("banana", "banAna"), ("banana", "apple"), ("banana", "torpedo"), ("apple", "torpedo")
+    ]
+
+    # vectors come from the on-disk cache, en_core_web_sm is only loaded if some word was never embedded before.
+    words_1, words_2 = zip(*word_pairs)
+    words = list(dict.fromkeys(words_1 + words_2))
+    with EmbeddingStore(".embedding-cache", "en_core_web_sm") as embedding_store:
+        word_similarity = WordSimilarity(words, embedding_store.vectors(words))
+
+    # all the pairs are scored in one call.
+    similarities = word_similarity.similarity(words_1, words_2)
 
     table = PrettyTable()
     table.field_names = ["Word 1", "Word 2", "Cosine Similarity"]
-    table.add_row(["banana", "banana", cosine_sim(banana_vec, banana_vec)])
-    table.add_row(["banana", "banAna", cosine_sim(banana_vec, banAna_vec)])
-    table.add_row(["banana", "apple", cosine_sim(banana_vec, apple_vec)])
-    table.add_row(["banana", "torpedo", cosine_sim(banana_vec, torpedo_vec)])
-    table.add_row(["apple", "torpedo", cosine_sim(apple_vec, torpedo_vec)])
+    for (word_1, word_2), similarity in zip(word_pairs, similarities):
+        table.add_row([word_1, word_2, similarity])
 
     print(table)
-
-
-
-
@@ -0,0 +1,69 @@
+""" Training throughput of the custom loss model in eager, graph and XLA mode on synthetic data (CPU) """
+
+import os
+import time
+import argparse
+import numpy as np
+
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+import tensorflow as tf
+
+from tensorflow.keras.layers import Dense
+from losses import ScaledDifferenceLoss
+
+# mode: (run_eagerly, jit_compile) for model.compile, the loss follows the model.
+MODES = {"eager": (True, False), "graph": (False, False), "xla": (False, True)}
+
+class StepTimer(tf.keras.callbacks.Callback):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.step_times = []
+
+    def on_train_batch_begin(self, batch, logs=None) -> None:
+        self._start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None) -> None:
+        self.step_times.append(time.perf_counter() - self._start)
+
+def make_model(features: int, units: int) -> tf.keras.Model:
+    # same model as custom_loss_example.py, only wider when asked to.
+    model = tf.keras.Sequential()
+    model.add(tf.keras.Input(shape=(features,)))
+    model.add(Dense(units=units, activation="sigmoid", kernel_initializer="glorot_normal", bias_initializer="glorot_normal"))
+    return model
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=200_000)
+    parser.add_argument("--features", type=int, default=3)
+    parser.add_argument("--units", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--epochs", type=int, default=2, help="the first epoch is warm up (tracing / compilation)")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    x = rng.random((args.samples, args.features), dtype=np.float32)
+    y = rng.integers(0, 2, (args.samples, args.units)).astype(np.float32)
+
+    print(f"{'mode':>6} {'steps/s':>10} {'p50 (ms)':>10} {'p95 (ms)':>10} {'warm up (s)':>12}")
+    for mode in args.modes:
+        run_eagerly, jit_compile = MODES[mode]
+        tf.keras.utils.set_random_seed(0)
+        model = make_model(args.features, args.units)
+        model.compile(loss=ScaledDifferenceLoss(extra_parameter=10), run_eagerly=run_eagerly, jit_compile=jit_compile)
+
+        timer = StepTimer()
+        model.fit(x, y, batch_size=args.batch_size, epochs=args.epochs, callbacks=[timer], verbose=0)
+
+        steps_per_epoch = int(np.ceil(args.samples / args.batch_size))
+        warm_up = np.array(timer.step_times[:steps_per_epoch])
+        measured = np.array(timer.step_times[steps_per_epoch:] or timer.step_times)
+        print(
+            f"{mode:>6} {1/measured.mean():10.1f} {np.percentile(measured, 50)*1000:10.3f} "
+            f"{np.percentile(measured, 95)*1000:10.3f} {warm_up.sum():12.2f}"
+        )
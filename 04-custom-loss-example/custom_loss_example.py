@@ -3,10 +3,11 @@
 import tensorflow as tf
 
 from tensorflow.keras.layers import Dense
+from losses import ScaledDifferenceLoss
+from dense_verification import verify_dense_stack
 
-# custom loss
-def custom_loss(y_true, y_pred, extra_parameter=10):
-    return extra_parameter*(y_true - y_pred)
+# custom loss (see losses.py, extra_parameter*(y_true - y_pred))
+custom_loss = ScaledDifferenceLoss(extra_parameter=10)
 
 # make model
 model = tf.keras.Sequential()
@@ -30,19 +31,10 @@ y = tf.convert_to_tensor([[0., 1.], [1., 0.]])
 model.fit(x, y)
 
 # check:
-weights = tf.convert_to_tensor(model.layers[0].get_weights()[0])
-bias = tf.convert_to_tensor(model.layers[0].get_weights()[1])
-
-network_output = []
-for feature_vector in x:
-    feature_output = []
-    for neuron in range(2):
-        linear_combination = tf.reduce_sum(weights[:, neuron]*feature_vector) + bias[neuron]
-        activation_ouptut = tf.sigmoid(linear_combination)
-        feature_output.append(activation_ouptut)
-    network_output.append(feature_output)
-
-calculated_ypred = tf.convert_to_tensor(network_output)
+verification = verify_dense_stack(model, x)
+print(f"matches model.predict: {verification['match']} (max abs error {verification['max_abs_error']:.2e})")
+
+calculated_ypred = tf.convert_to_tensor(verification["calculated"])
 
 # match this with the loss shown during fit
 print(f"calculated loss value: {tf.reduce_mean(10*(y - calculated_ypred))}")
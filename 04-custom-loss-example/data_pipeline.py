@@ -0,0 +1,144 @@
+""" Streams training data from disk (memory-mapped .npy or TFRecord) through tf.data """
+
+import os
+import glob
+import time
+import argparse
+import numpy as np
+import tensorflow as tf
+
+AUTOTUNE = tf.data.AUTOTUNE
+
+def write_npy(x: np.ndarray, y: np.ndarray, directory: str) -> None:
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, "features.npy"), np.asarray(x, dtype=np.float32))
+    np.save(os.path.join(directory, "labels.npy"), np.asarray(y, dtype=np.float32))
+
+def write_tfrecord(x: np.ndarray, y: np.ndarray, directory: str, shards: int=4) -> None:
+    # one tf.train.Example per sample, spread over a few shards so they can be read in parallel.
+    os.makedirs(directory, exist_ok=True)
+    for shard, rows in enumerate(np.array_split(np.arange(len(x)), shards)):
+        with tf.io.TFRecordWriter(os.path.join(directory, f"data-{shard:05d}.tfrecord")) as writer:
+            for row in rows:
+                example = tf.train.Example(features=tf.train.Features(feature={
+                    "x": tf.train.Feature(float_list=tf.train.FloatList(value=x[row])),
+                    "y": tf.train.Feature(float_list=tf.train.FloatList(value=y[row]))
+                }))
+                writer.write(example.SerializeToString())
+
+def npy_dataset(directory: str, batch_size: int=256, shuffle_buffer: int=10_000, seed: int=0) -> tf.data.Dataset:
+    """
+    --> features.npy and labels.npy are memory-mapped, only the rows of the current batches are ever read.
+    --> Row indices are shuffled and batched first, then every batch is gathered with one read in parallel map calls.
+    --> prefetch keeps the next batches ready while the model trains on the current one.
+    """
+    features = np.load(os.path.join(directory, "features.npy"), mmap_mode="r")
+    labels = np.load(os.path.join(directory, "labels.npy"), mmap_mode="r")
+
+    def gather(rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # sorted rows read the memory map front to back, the order inside a batch does not matter for training.
+        rows = np.sort(rows)
+        return np.asarray(features[rows]), np.asarray(labels[rows])
+
+    def load_batch(rows: tf.Tensor) -> tuple[tf.Tensor, tf.Tensor]:
+        x, y = tf.numpy_function(gather, [rows], (tf.float32, tf.float32))
+        x.set_shape((None, features.shape[1]))
+        y.set_shape((None, labels.shape[1]))
+        return x, y
+
+    return (
+        tf.data.Dataset.range(len(features))
+        .shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+        .batch(batch_size)
+        .map(load_batch, num_parallel_calls=AUTOTUNE, deterministic=False)
+        .prefetch(AUTOTUNE)
+    )
+
+def tfrecord_dataset(
+    directory: str, features: int, units: int, batch_size: int=256, shuffle_buffer: int=10_000, seed: int=0
+) -> tf.data.Dataset:
+    """
+    --> Shards are read in parallel, examples are shuffled and batched, then parsed a whole batch per parallel map call.
+    """
+    files = sorted(glob.glob(os.path.join(directory, "*.tfrecord")))
+    description = {
+        "x": tf.io.FixedLenFeature([features], tf.float32),
+        "y": tf.io.FixedLenFeature([units], tf.float32)
+    }
+
+    def parse_batch(serialized: tf.Tensor) -> tuple[tf.Tensor, tf.Tensor]:
+        parsed = tf.io.parse_example(serialized, description)
+        return parsed["x"], parsed["y"]
+
+    return (
+        tf.data.TFRecordDataset(files, num_parallel_reads=AUTOTUNE)
+        .shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+        .batch(batch_size)
+        .map(parse_batch, num_parallel_calls=AUTOTUNE, deterministic=False)
+        .prefetch(AUTOTUNE)
+    )
+
+def input_report(dataset: tf.data.Dataset, model: tf.keras.Model, steps: int=200) -> dict:
+    """
+    --> Tells whether training waits on the input pipeline.
+    --> Times reading batches alone, then training steps on a batch already in memory (no input cost at all).
+    --> When the pipeline delivers fewer batches per second than the model consumes, training is input bound.
+    --> The training steps run on a clone of the compiled model, the weights and optimizer of model are left untouched.
+    """
+    start = time.perf_counter()
+    batch = None
+    for batch in dataset.take(steps):
+        pass
+    input_rate = steps / (time.perf_counter() - start)
+
+    timing_model = tf.keras.models.clone_model(model)
+    timing_model.set_weights(model.get_weights())
+    timing_model.compile(
+        optimizer=model.optimizer.__class__.from_config(model.optimizer.get_config()), loss=model.loss
+    )
+
+    # the first fit call traces the train step, only the second one is timed.
+    in_memory = tf.data.Dataset.from_tensors(batch).repeat()
+    timing_model.fit(in_memory, steps_per_epoch=1, verbose=0)
+    start = time.perf_counter()
+    timing_model.fit(in_memory, steps_per_epoch=steps, verbose=0)
+    train_rate = steps / (time.perf_counter() - start)
+
+    return {
+        "input_batches_per_s": input_rate,
+        "train_steps_per_s": train_rate,
+        "input_bound": input_rate < train_rate,
+        # share of every step that reading the batch would take if nothing overlapped.
+        "input_time_share": train_rate / (input_rate + train_rate)
+    }
+
+if __name__ == "__main__":
+
+    from losses import ScaledDifferenceLoss
+    from benchmark_loss import make_model
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("directory", help="where the synthetic dataset is written and read back from")
+    parser.add_argument("--format", choices=["npy", "tfrecord"], default="npy")
+    parser.add_argument("--samples", type=int, default=1_000_000)
+    parser.add_argument("--features", type=int, default=3)
+    parser.add_argument("--units", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument("--epochs", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    x = rng.random((args.samples, args.features), dtype=np.float32)
+    y = rng.integers(0, 2, (args.samples, args.units)).astype(np.float32)
+    if args.format == "npy":
+        write_npy(x, y, args.directory)
+        dataset = npy_dataset(args.directory, args.batch_size)
+    else:
+        write_tfrecord(x, y, args.directory)
+        dataset = tfrecord_dataset(args.directory, args.features, args.units, args.batch_size)
+    del x, y
+
+    model = make_model(args.features, args.units)
+    model.compile(loss=ScaledDifferenceLoss(extra_parameter=10))
+    print(input_report(dataset, model))
+    model.fit(dataset, epochs=args.epochs)
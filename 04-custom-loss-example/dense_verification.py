@@ -0,0 +1,55 @@
+""" Recomputes Dense layers as batched matrix products to verify a model's output """
+
+import numpy as np
+import tensorflow as tf
+
+from tensorflow.keras.layers import Dense, InputLayer
+
+def dense_forward(layer: Dense, x: tf.Tensor, weights: list[np.ndarray]=None) -> tf.Tensor:
+    # the whole batch at once: activation(x @ W + b), instead of one reduce_sum per feature vector and neuron.
+    weights = weights if weights is not None else layer.get_weights()
+    output = tf.matmul(tf.cast(x, weights[0].dtype), weights[0])
+    if layer.use_bias:
+        output = tf.nn.bias_add(output, weights[1])
+    return layer.activation(output)
+
+def dense_stack(model: tf.keras.Model) -> list[Dense]:
+    layers = [layer for layer in model.layers if not isinstance(layer, InputLayer)]
+    for layer in layers:
+        if not isinstance(layer, Dense):
+            raise ValueError(f"only stacks of Dense layers can be recomputed, found {type(layer).__name__} ({layer.name})")
+    return layers
+
+def stack_forward(model: tf.keras.Model, x, chunk_size: int=8192) -> np.ndarray:
+    """
+    --> Runs x through every Dense layer of the model with dense_forward, chunk_size rows at a time.
+    --> Chunking bounds the memory of the intermediate activations, whatever the number of inputs and units.
+    """
+    layers = dense_stack(model)
+    # weights are copied out of the layers once, not once per chunk.
+    weights = [layer.get_weights() for layer in layers]
+    x = np.asarray(x)
+    if len(x) == 0:
+        return np.empty((0, layers[-1].units), dtype=weights[-1][0].dtype)
+    outputs = []
+    for start in range(0, len(x), chunk_size):
+        output = tf.convert_to_tensor(x[start:start+chunk_size])
+        for layer, layer_weights in zip(layers, weights):
+            output = dense_forward(layer, output, layer_weights)
+        outputs.append(output.numpy())
+    return np.concatenate(outputs)
+
+def verify_dense_stack(model: tf.keras.Model, x, chunk_size: int=8192, atol: float=1e-5, rtol: float=1e-5) -> dict:
+    """
+    --> Compares the recomputed stack against model.predict on the same inputs.
+    --> Returns the recomputed output, the prediction, the largest absolute difference and whether they match.
+    """
+    calculated = stack_forward(model, x, chunk_size)
+    # model.predict fails on zero rows, there is nothing to compare then.
+    predicted = model.predict(np.asarray(x), batch_size=chunk_size, verbose=0) if len(calculated) else calculated.copy()
+    return {
+        "calculated": calculated,
+        "predicted": predicted,
+        "max_abs_error": float(np.max(np.abs(calculated - predicted))) if calculated.size else 0.0,
+        "match": bool(np.allclose(calculated, predicted, atol=atol, rtol=rtol))
+    }
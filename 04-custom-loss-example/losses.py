@@ -0,0 +1,35 @@
+""" Configurable, serializable version of the custom loss """
+
+import tensorflow as tf
+
+@tf.keras.utils.register_keras_serializable(package="custom_loss_example")
+class ScaledDifferenceLoss(tf.keras.losses.Loss):
+
+    def __init__(
+        self, extra_parameter: float=10., jit_compile: bool=None, name: str="scaled_difference", **kwargs
+    ) -> None:
+        """
+        --> Same loss as the custom_loss closure: extra_parameter*(y_true - y_pred), averaged over the batch.
+        --> extra_parameter is now a constructor argument and is saved with the model through get_config.
+        --> jit_compile=None leaves compilation to the model (eager or graph, whatever fit runs in).
+        --> jit_compile=False wraps the loss in a tf.function graph, jit_compile=True compiles it with XLA.
+        """
+        super().__init__(name=name, **kwargs)
+        self.extra_parameter = extra_parameter
+        self.jit_compile = jit_compile
+        if jit_compile is None:
+            self._loss = self._scaled_difference
+        else:
+            self._loss = tf.function(self._scaled_difference, jit_compile=jit_compile, reduce_retracing=True)
+
+    def _scaled_difference(self, y_true: tf.Tensor, y_pred: tf.Tensor) -> tf.Tensor:
+        y_true = tf.cast(y_true, y_pred.dtype)
+        return tf.cast(self.extra_parameter, y_pred.dtype) * (y_true - y_pred)
+
+    def call(self, y_true: tf.Tensor, y_pred: tf.Tensor) -> tf.Tensor:
+        return self._loss(y_true, y_pred)
+
+    def get_config(self) -> dict:
+        config = super().get_config()
+        config.update({"extra_parameter": self.extra_parameter, "jit_compile": self.jit_compile})
+        return config
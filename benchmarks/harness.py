@@ -0,0 +1,113 @@
+""" Timing, peak memory and baseline comparison for the benchmark suite """
+
+import json
+import time
+import timeit
+import platform
+import statistics
+import tracemalloc
+import importlib.util
+import numpy as np
+
+BENCHMARKS = []
+
+class Benchmark():
+
+    def __init__(self, name: str, setup, sizes: list[int], requires: tuple[str]=(), available=None) -> None:
+        """
+        --> setup(size) prepares the inputs outside of the timing and returns the callable that is timed.
+        --> requires lists modules that must be importable, available() can check anything else (e.g. a spaCy model).
+        --> Benchmarks whose requirements are missing are reported as skipped, never as failures.
+        """
+        self.name = name
+        self.setup = setup
+        self.sizes = sizes
+        self.requires = requires
+        self.available = available
+
+    def skip_reason(self) -> str:
+        for module in self.requires:
+            if importlib.util.find_spec(module) is None:
+                return f"{module} is not installed"
+        if self.available is not None:
+            return self.available()
+        return None
+
+def benchmark(name: str, sizes: list[int], requires: tuple[str]=(), available=None):
+    # registers the decorated setup function in BENCHMARKS, in definition order.
+    def register(setup):
+        BENCHMARKS.append(Benchmark(name, setup, sizes, requires, available))
+        return setup
+    return register
+
+def measure(function, repeat: int) -> dict:
+    """
+    --> One warm up call (caches, tracing, lazy imports), then repeat timed calls, then one call under tracemalloc.
+    --> Memory is traced in its own call since tracemalloc slows down every allocation it sees.
+    --> The peak only covers allocations made through Python's allocators, which includes numpy arrays.
+    """
+    function()
+    times = timeit.repeat(function, number=1, repeat=repeat)
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"best_s": min(times), "median_s": statistics.median(times), "peak_kb": peak / 1024}
+
+def run(benchmarks: list[Benchmark], repeat: int=5, quick: bool=False, log=print) -> dict:
+    results, skipped = [], {}
+    for bench in benchmarks:
+        reason = bench.skip_reason()
+        if reason is not None:
+            skipped[bench.name] = reason
+            log(f"{bench.name:<32} skipped ({reason})")
+            continue
+        for size in bench.sizes[:1] if quick else bench.sizes:
+            result = {"name": bench.name, "size": size, **measure(bench.setup(size), repeat)}
+            results.append(result)
+            log(
+                f"{bench.name:<32} {size:>10} {result['best_s']*1000:12.3f} ms "
+                f"{result['median_s']*1000:12.3f} ms {result['peak_kb']:12.1f} KB"
+            )
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {"python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform()},
+        "repeat": repeat,
+        "results": results,
+        "skipped": skipped
+    }
+
+def save(report: dict, path: str) -> None:
+    with open(path, "w") as report_file:
+        json.dump(report, report_file, indent=2)
+
+def load(path: str) -> dict:
+    with open(path) as report_file:
+        return json.load(report_file)
+
+def compare(report: dict, baseline: dict, tolerance: float=0.25) -> list[dict]:
+    """
+    --> Matches results to the baseline by (name, size) and flags the ones slower or larger than tolerance allows.
+    --> The best time is compared rather than the median, it is the least sensitive to other load on the machine.
+    --> Results with no baseline entry (new benchmarks or sizes) are never regressions.
+    """
+    baseline_results = {(result["name"], result["size"]): result for result in baseline["results"]}
+    comparisons = []
+    for result in report["results"]:
+        previous = baseline_results.get((result["name"], result["size"]))
+        if previous is None:
+            continue
+        time_ratio = result["best_s"] / previous["best_s"] if previous["best_s"] else 1.0
+        memory_ratio = result["peak_kb"] / previous["peak_kb"] if previous["peak_kb"] else 1.0
+        comparisons.append({
+            "name": result["name"],
+            "size": result["size"],
+            "time_ratio": time_ratio,
+            "memory_ratio": memory_ratio,
+            "regression": time_ratio > 1 + tolerance or memory_ratio > 1 + tolerance
+        })
+    return comparisons
@@ -0,0 +1,78 @@
+""" Cold start import time of every script, from python -X importtime in a fresh interpreter each """
+
+import sys
+import json
+import time
+import pathlib
+import argparse
+import subprocess
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+# name: (folder the command runs in, python arguments)
+ENTRY_POINTS = {
+    "transform_core": (".", ["-c", "import transform_core"]),
+    "01 --compute-only": ("01-span-transformation-visualization", ["span_transformation.py", "--compute-only"]),
+    "01 import": ("01-span-transformation-visualization", ["-c", "import span_transformation"]),
+    "02 --compute-only": ("02-dot-product-visualization", ["dot-product-transform.py", "--compute-only"]),
+    "03 import": ("03-spacy-vector-study", ["-c", "import similarity, embedding_store, spacy_word_vec_test"]),
+    "04 import": ("04-custom-loss-example", ["-c", "import losses, dense_verification"])
+}
+
+# the dependencies worth seconds of start up, reported as loaded or not for every entry point.
+HEAVY_MODULES = ["streamlit", "plotly", "spacy", "tensorflow"]
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """
+    --> (module, depth, cumulative microseconds) for every line of -X importtime output.
+    --> Depth 0 are the imports made by the command itself, their cumulative times add up to the total.
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), depth, int(cumulative)))
+    return modules
+
+def profile(folder: str, arguments: list[str], top: int=5) -> dict:
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", *arguments], cwd=ROOT / folder, capture_output=True, text=True
+    )
+    wall_time = time.perf_counter() - start
+    modules = parse_importtime(completed.stderr)
+    top_level = sorted((module for module in modules if module[1] == 0), key=lambda module: -module[2])
+    loaded = {name.split(".")[0] for name, _, _ in modules}
+    return {
+        "returncode": completed.returncode,
+        "wall_ms": wall_time * 1000,
+        "import_ms": sum(module[2] for module in top_level) / 1000,
+        "top_imports": [{"module": name, "ms": cumulative / 1000} for name, _, cumulative in top_level[:top]],
+        "heavy_loaded": [module for module in HEAVY_MODULES if module in loaded]
+    }
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--only", nargs="+", default=None, choices=list(ENTRY_POINTS))
+    parser.add_argument("--top", type=int, default=3, help="heaviest imports listed per entry point")
+    parser.add_argument("--output", default=None, help="also save the report as JSON")
+    args = parser.parse_args()
+
+    report = {}
+    print(f"{'entry point':<20} {'imports (ms)':>13} {'wall (ms)':>10}  heavy modules loaded / heaviest imports")
+    for name in args.only or ENTRY_POINTS:
+        folder, arguments = ENTRY_POINTS[name]
+        report[name] = result = profile(folder, arguments, args.top)
+        failed = "" if result["returncode"] == 0 else f" (exit code {result['returncode']})"
+        heaviest = ", ".join(f"{entry['module']} {entry['ms']:.0f}" for entry in result["top_imports"])
+        print(
+            f"{name:<20} {result['import_ms']:13.0f} {result['wall_ms']:10.0f}  "
+            f"[{', '.join(result['heavy_loaded']) or '-'}] {heaviest}{failed}"
+        )
+
+    if args.output is not None:
+        with open(args.output, "w") as report_file:
+            json.dump(report, report_file, indent=2)
@@ -0,0 +1,146 @@
+""" Benchmarks the hot paths of every script and compares them against a stored baseline """
+
+import os
+import sys
+import pathlib
+import argparse
+import tempfile
+import contextlib
+import importlib.util
+import numpy as np
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+# scripts are imported from their own folders, the way they import each other.
+for folder in ["01-span-transformation-visualization", "03-spacy-vector-study", "04-custom-loss-example"]:
+    sys.path.append(str(ROOT / folder))
+
+import transform_core as tc
+
+from harness import BENCHMARKS, benchmark, compare, load, run, save
+
+TRANSFORM = np.array([[1, -2], [1, 0]])
+BASIS_COLORS = ["#33cc33", "#006600"]
+GRID_COLOR = "#3399ff"
+SPACY_MODEL = "en_core_web_sm"
+
+# files written by the timed callables, their directories are removed once run() is done with them.
+CLEANUP = contextlib.ExitStack()
+
+def spacy_model_available() -> str:
+    if importlib.util.find_spec(SPACY_MODEL) is None:
+        return f"the {SPACY_MODEL} pipeline is not installed"
+    return None
+
+def random_vectors(count: int, width: int=96) -> np.ndarray:
+    return np.random.default_rng(0).normal(size=(count, width)).astype(np.float32)
+
+
+# ============================================================================================================
+# 01 / 02 GRIDS (sizes are GRID_SIZE, a grid has (2 * GRID_SIZE + 1)^2 points)
+# ============================================================================================================
+
+@benchmark("grid.initial_basis", sizes=[50, 200, 1000])
+def initial_basis(size: int):
+    return lambda: tc.InitialBasis(np.eye(2), size, 1)
+
+@benchmark("transform.per_point", sizes=[10, 50])
+def per_point_transform(size: int):
+    from benchmark_transform import loop_transform
+    grid = tc.InitialBasis(np.eye(2), size, 1).grid
+    return lambda: loop_transform(TRANSFORM, grid)
+
+@benchmark("transform.batched", sizes=[50, 200, 1000])
+def batched_transform(size: int):
+    grid = tc.InitialBasis(np.eye(2), size, 1).grid
+    return lambda: tc.batch_transform(TRANSFORM, grid)
+
+@benchmark("render.plot_grid_write_html", sizes=[3, 10, 30])
+def plot_grid(size: int):
+    # figure build and write_html together, the way the scripts run a stage.
+    directory = CLEANUP.enter_context(tempfile.TemporaryDirectory())
+    grid = tc.Grid(size, BASIS_COLORS, GRID_COLOR)
+    transformed_grid = tc.batch_transform(TRANSFORM, tc.InitialBasis(np.eye(2), size, 1).grid)
+    return lambda: grid.plot_grid(TRANSFORM, transformed_grid, os.path.join(directory, "grid.html"), "benchmark")
+
+
+# ============================================================================================================
+# 03 WORD VECTORS (sizes are numbers of words)
+# ============================================================================================================
+
+@benchmark("similarity.cosine_sim_pairwise", sizes=[50, 200])
+def cosine_sim_pairwise(size: int):
+    # every pair of words through the original one pair at a time cosine_sim.
+    from spacy_word_vec_test import cosine_sim
+    vectors = random_vectors(size)
+    return lambda: [[cosine_sim(vector_1, vector_2) for vector_2 in vectors] for vector_1 in vectors]
+
+@benchmark("similarity.batched_pairwise", sizes=[200, 2000])
+def batched_pairwise(size: int):
+    from similarity import WordSimilarity
+    words = [f"word{index}" for index in range(size)]
+    word_similarity = WordSimilarity(words, random_vectors(size))
+    return lambda: word_similarity.pairwise()
+
+@benchmark("similarity.embed", sizes=[100, 1000], requires=("spacy",), available=spacy_model_available)
+def embed(size: int):
+    import spacy
+    from similarity import embed as embed_words
+    nlp = spacy.load(SPACY_MODEL)
+    words = [f"word{index}" for index in range(size)]
+    return lambda: embed_words(nlp, words)
+
+
+# ============================================================================================================
+# 04 CUSTOM LOSS (sizes are training samples, one epoch of batch 256 per call)
+# ============================================================================================================
+
+@benchmark("loss.fit_epoch", sizes=[10_000, 100_000], requires=("tensorflow",))
+def fit_epoch(size: int):
+    import tensorflow as tf
+    from losses import ScaledDifferenceLoss
+    from benchmark_loss import make_model
+    tf.keras.utils.set_random_seed(0)
+    rng = np.random.default_rng(0)
+    x = rng.random((size, 3), dtype=np.float32)
+    y = rng.integers(0, 2, (size, 2)).astype(np.float32)
+    model = make_model(3, 2)
+    model.compile(loss=ScaledDifferenceLoss(extra_parameter=10))
+    return lambda: model.fit(x, y, batch_size=256, epochs=1, verbose=0)
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--only", nargs="+", default=None, help="benchmark names or name prefixes to run, e.g. grid transform")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="only the smallest size of every benchmark")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", default=str(pathlib.Path(__file__).with_name("baseline.json")))
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slow down / memory growth, 0.25 is 25%%")
+    args = parser.parse_args()
+
+    benchmarks = [
+        bench for bench in BENCHMARKS
+        if args.only is None or any(bench.name.startswith(prefix) for prefix in args.only)
+    ]
+    print(f"{'benchmark':<32} {'size':>10} {'best':>15} {'median':>15} {'peak memory':>15}")
+    with CLEANUP:
+        report = run(benchmarks, args.repeat, args.quick)
+    save(report, args.output)
+
+    if args.save_baseline:
+        save(report, args.baseline)
+        print(f"\nbaseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        comparisons = compare(report, load(args.baseline), args.tolerance)
+        print(f"\n{'benchmark':<32} {'size':>10} {'time':>10} {'memory':>10}")
+        for comparison in comparisons:
+            print(
+                f"{comparison['name']:<32} {comparison['size']:>10} {comparison['time_ratio']:9.2f}x "
+                f"{comparison['memory_ratio']:9.2f}x {'REGRESSION' if comparison['regression'] else ''}"
+            )
+        if any(comparison["regression"] for comparison in comparisons):
+            sys.exit(1)
+    else:
+        print(f"\nno baseline at {args.baseline}, run with --save-baseline to store one")
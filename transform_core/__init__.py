@@ -0,0 +1,40 @@
+""" Shared linear transformation core for the span and dot product visualizations """
+
+import importlib
+
+from transform_core.analysis import BasisAnalysis, matrix_label, project
+from transform_core.basis import (
+    Basis, InitialBasis, InverseTransformBasis, batch_transform, blockwise_transform, interpolate_bases, interpolated_grids
+)
+from transform_core.inverse import Factorization, FactorizationCache, SingularBasisError, factorize
+from transform_core.pipeline import TransformPipeline
+from transform_core.profiling import Profiler, profiled, profiler, span
+
+__all__ = [
+    "Basis", "InitialBasis", "InverseTransformBasis", "batch_transform", "blockwise_transform", "interpolate_bases",
+    "interpolated_grids", "Factorization", "FactorizationCache", "SingularBasisError", "factorize",
+    "BasisAnalysis", "FigureExporter", "Grid", "Profiler", "StageApp", "StageScheduler", "TransformPipeline", "config_key",
+    "export_stages", "matrix_label", "profiled", "profiler", "project", "render_stage", "span", "stage_animation",
+    "timing_panel"
+]
+
+# the rendering modules need plotly, they are only imported once one of their names is first used,
+# so scripts that only compute grids never pay for it.
+_RENDERING = {
+    "config_key": "transform_core.app",
+    "stage_animation": "transform_core.app",
+    "timing_panel": "transform_core.app",
+    "StageApp": "transform_core.app",
+    "FigureExporter": "transform_core.export",
+    "Grid": "transform_core.grid",
+    "StageScheduler": "transform_core.scheduler",
+    "export_stages": "transform_core.scheduler",
+    "render_stage": "transform_core.scheduler"
+}
+
+def __getattr__(name: str):
+    if name not in _RENDERING:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_RENDERING[name]), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,97 @@
+""" Batched analysis of N-dimensional bases and their projection for display """
+
+import numpy as np
+
+def matrix_label(matrix: np.ndarray, digits: int=6) -> str:
+    """
+    --> Readable form of a basis or vector for plot titles, e.g. [[1, -2], [1, 0]] or [1, 2].
+    --> Entries are shown with up to digits significant digits, so round-off such as 0.49999999999 reads as 0.5.
+    """
+    matrix = np.asarray(matrix)
+    if matrix.ndim == 0:
+        value = float(matrix)
+        # -0.0 and round-off around 0 are both shown as 0.
+        return f"{value + 0.0:.{digits}g}" if round(value, digits) != 0 else "0"
+    return "[" + ", ".join(matrix_label(row, digits) for row in matrix) + "]"
+
+def project(points: np.ndarray, dims: int=2, axes: np.ndarray=None) -> np.ndarray:
+    """
+    --> Projects N-dimensional points (..., N) onto dims display axes, giving (..., dims) for a 2D or 3D plot.
+    --> axes is an (N, dims) matrix with one display axis per column, by default the first dims coordinate axes.
+    --> Points with fewer than dims coordinates are padded with zeros.
+    """
+    points = np.asarray(points)
+    if dims not in (2, 3):
+        raise ValueError(f"points can only be projected to 2 or 3 dimensions for display, got {dims}")
+    if axes is None:
+        axes = np.eye(points.shape[-1], dims)
+    axes = np.asarray(axes)
+    if axes.shape != (points.shape[-1], dims):
+        raise ValueError(f"axes of shape {axes.shape} can not project {points.shape[-1]}D points to {dims}D")
+    return np.matmul(points, axes)
+
+class BasisAnalysis():
+
+    def __init__(self, bases: np.ndarray) -> None:
+        """
+        --> Determinants, singular values, rank (span dimension), condition numbers, eigenvalues and inverses of a whole batch.
+        --> bases is a (B, N, N) stack, or a single (N, N) basis, with one basis vector per row as in tc.Basis.
+        --> Every quantity is computed once for the whole batch by the stacked numpy.linalg routines, no per-basis loop.
+        --> A basis is singular by the same rule as tc.Factorization: smallest singular value at round-off level of the largest.
+        """
+        self.bases = np.asarray([getattr(basis, "basis", basis) for basis in bases] if isinstance(bases, list) else bases)
+        if self.bases.ndim == 2:
+            self.bases = self.bases[None]
+        if self.bases.ndim != 3 or self.bases.shape[1] != self.bases.shape[2]:
+            raise ValueError(f"expected a (B, N, N) stack of square bases, got {self.bases.shape}")
+        self.dimension = self.bases.shape[1]
+
+        # the column form is the matrix of the transformation, see tc.Basis.matrix.
+        self.matrices = np.transpose(self.bases, (0, 2, 1)).astype(np.float64)
+
+        self.determinants = np.linalg.det(self.matrices)
+        self.left_vectors, self.singular_values, self.right_vectors = np.linalg.svd(self.matrices)
+        self.eigenvalues = np.linalg.eigvals(self.matrices)
+
+        tolerances = self.singular_values[:, :1] * self.dimension * np.finfo(np.float64).eps
+        # number of linearly independent basis vectors, i.e. the dimension of their span.
+        self.ranks = np.count_nonzero(self.singular_values > tolerances, axis=-1)
+        self.invertible = self.ranks == self.dimension
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.condition_numbers = np.where(
+                self.invertible, self.singular_values[:, 0] / self.singular_values[:, -1], np.inf
+            )
+
+        # inverse bases in the row form (same as tc.InverseTransformBasis), NaN where there is no inverse.
+        self.inverses = np.full_like(self.matrices, np.nan)
+        if self.invertible.any():
+            self.inverses[self.invertible] = np.transpose(np.linalg.inv(self.matrices[self.invertible]), (0, 2, 1))
+
+    def __len__(self) -> int:
+        return len(self.bases)
+
+    def transform(self, points: np.ndarray) -> np.ndarray:
+        # every basis applied to the same (..., N) points in one stacked multiply, giving (B, ..., N).
+        points = np.asarray(points, dtype=np.float64)
+        flat_points = points.reshape(-1, self.dimension)
+        return np.matmul(flat_points[None], self.bases).reshape((len(self),) + points.shape)
+
+    def principal_axes(self, index: int, dims: int=2) -> np.ndarray:
+        """
+        --> The dims output directions basis index stretches the most (its leading left singular vectors), as an (N, dims) matrix.
+        --> Used as project(..., axes=) this shows the transformed grid from the view that loses the least of it.
+        """
+        axes = self.left_vectors[index, :, :dims]
+        if axes.shape[1] < dims:
+            axes = np.pad(axes, ((0, 0), (0, dims - axes.shape[1])))
+        return axes
+
+    def summary(self, index: int) -> dict:
+        return {
+            "basis": self.bases[index].tolist(),
+            "determinant": float(self.determinants[index]),
+            "rank": int(self.ranks[index]),
+            "singular_values": self.singular_values[index].tolist(),
+            "condition_number": float(self.condition_numbers[index]),
+            "eigenvalues": self.eigenvalues[index].tolist()
+        }
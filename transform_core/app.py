@@ -0,0 +1,197 @@
+""" Building, exporting and serving the stage figures of a visualization script, from a Streamlit app or headless """
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import numpy as np
+
+from typing import TYPE_CHECKING
+from transform_core.analysis import matrix_label
+from transform_core.basis import InitialBasis
+from transform_core.profiling import profiled, profiler
+
+# plotly is only imported once a figure is built, so --compute-only never loads it.
+if TYPE_CHECKING:
+    import plotly.graph_objs as go
+    from transform_core.grid import Grid
+
+def config_key(config) -> str:
+    """
+    --> Hash of every upper case setting of a config module, used as the cache key of the app.
+    --> Editing config.py changes the key, so the cached figures are rebuilt only then.
+    """
+    settings = []
+    for name in sorted(dir(config)):
+        if name.isupper():
+            value = getattr(config, name)
+            if isinstance(value, np.ndarray):
+                value = (value.dtype.str, value.tolist())
+            settings.append(f"{name}={value!r}")
+    return hashlib.sha256("\n".join(settings).encode()).hexdigest()
+
+@profiled("render.stage_animation")
+def stage_animation(figs: list[go.Figure], frame_duration: int=3000) -> go.Figure:
+    """
+    --> Puts every stage figure into one figure as plotly frames, with a play button and a slider.
+    --> The browser cycles through the stages, so the server only sends the figure once.
+    """
+    import plotly.graph_objs as go
+    from transform_core.grid import animation_controls
+
+    frames = [
+        go.Frame(
+            data=fig.data, name=str(index),
+            layout=go.Layout(title=fig.layout.title, annotations=fig.layout.annotations)
+        )
+        for index, fig in enumerate(figs)
+    ]
+    animation = go.Figure(data=figs[0].data, layout=figs[0].layout, frames=frames)
+    animation.update_layout(**animation_controls([frame.name for frame in frames], frame_duration))
+    return animation
+
+def timing_panel(title: str="Timings") -> None:
+    """
+    --> Per-span timings of tc.profiler in a collapsed section of the page, only shown when profiling is on.
+    --> Cached figures are not rebuilt on reruns, so the table mostly holds the spans of the first run.
+    """
+    if not profiler.enabled:
+        return
+    import streamlit as st
+    with st.expander(title):
+        st.table([
+            {
+                "span": row["name"],
+                "calls": row["calls"],
+                "total (ms)": round(row["total_s"] * 1000, 3),
+                "mean (ms)": round(row["mean_s"] * 1000, 3),
+                "max (ms)": round(row["max_s"] * 1000, 3),
+                "allocated (KB)": None if row["allocated_kb"] is None else round(row["allocated_kb"], 1)
+            }
+            for row in profiler.stats()
+        ])
+
+class StageApp():
+
+    def __init__(self, config, compute_stages, build_interpolation=None, description: str=None) -> None:
+        """
+        --> Everything a visualization script does with its stages, so the script itself only computes them.
+        --> config is the script's config module, compute_stages() returns the tc.Grid.plot_grid arguments of every stage.
+        --> build_interpolation(grid_obj) optionally plots one more animated figure, exported and served first.
+        --> With BATCH_BASES in the config, --batch-export writes one figure per basis applied to the initial grid.
+        """
+        self.config = config
+        self.compute_stages = compute_stages
+        self.build_interpolation = build_interpolation
+        self.description = description
+
+    def grid_settings(self) -> dict:
+        # the tc.Grid arguments, also handed to the worker processes of the parallel export.
+        return {
+            "grid_size": self.config.GRID_SIZE, "basis_colors": self.config.BASIS_COLORS,
+            "grid_color": self.config.GRID_COLOR, "vector_color": getattr(self.config, "VECTOR_COLOR", None),
+            "render_mode": self.config.RENDER_MODE
+        }
+
+    def make_grid(self) -> Grid:
+        from transform_core.export import FigureExporter
+        from transform_core.grid import Grid
+        return Grid(**self.grid_settings(), exporter=FigureExporter(".", self.config.EXPORT_MODE))
+
+    def build_figures(self) -> list[go.Figure]:
+
+        grid_obj = self.make_grid()
+
+        # plotting every stage
+        all_figs = [grid_obj.plot_grid(**stage) for stage in self.compute_stages()]
+
+        # writing every figure that changed since the last run in one go
+        if self.config.EXPORT_COMBINED is not None:
+            grid_obj.exporter.add_combined(all_figs, self.config.EXPORT_COMBINED)
+        grid_obj.exporter.flush()
+
+        return all_figs
+
+    def export_figures(self) -> list[str]:
+        # every stage figure is built and written by its own worker process.
+        from transform_core.export import FigureExporter
+        from transform_core.scheduler import export_stages
+        return export_stages(
+            self.grid_settings(), self.compute_stages(), FigureExporter(".", self.config.EXPORT_MODE),
+            max_workers=self.config.EXPORT_WORKERS
+        )
+
+    def build_interpolation_figure(self) -> go.Figure:
+        grid_obj = self.make_grid()
+        interpolation_fig = self.build_interpolation(grid_obj)
+        grid_obj.exporter.flush()
+        return interpolation_fig
+
+    def batch_export(self, output_dir: str) -> list[str]:
+        """
+        --> One figure per basis of config.BATCH_BASES, each transforming the initial grid.
+        --> Transforming and rendering are separate stages of the scheduler, spread over every core.
+        """
+        from transform_core.export import FigureExporter
+        from transform_core.scheduler import export_stages
+        initial_basis_obj = InitialBasis(self.config.INITIAL_BASIS, self.config.GRID_SIZE, self.config.GRID_SPACING)
+        stages = [
+            {
+                "basis": basis, "transform": basis, "name": f"{index:03d}-batch.html",
+                "title": f"I * B{index} = {matrix_label(basis)}"
+            }
+            for index, basis in enumerate(self.config.BATCH_BASES)
+        ]
+        return export_stages(
+            self.grid_settings(), stages, FigureExporter(output_dir, self.config.EXPORT_MODE), initial_basis_obj.grid,
+            self.config.EXPORT_WORKERS
+        )
+
+    def serve(self) -> None:
+        # streamlit is only imported when the app is served, --compute-only and --export never load it.
+        import streamlit as st
+
+        # built once per config, reruns and new sessions reuse the cached figures instead of recomputing every grid.
+        # the animations are played by plotly in the browser, nothing blocks the script thread.
+        key = config_key(self.config)
+        if self.build_interpolation is not None:
+            st.plotly_chart(st.cache_resource(_cached_interpolation)(self, key))
+        st.plotly_chart(st.cache_resource(_cached_animation)(self, key))
+
+        # with TRANSFORM_CORE_PROFILE=1 set, where the build time went (see transform_core.profiling).
+        timing_panel()
+
+    def main(self, argv: list[str]=None) -> None:
+        parser = argparse.ArgumentParser(description=self.description)
+        parser.add_argument("--compute-only", action="store_true", help="compute every stage grid and print a summary")
+        parser.add_argument("--export", action="store_true", help="write the stage figures (see EXPORT_MODE) and exit")
+        if hasattr(self.config, "BATCH_BASES"):
+            parser.add_argument(
+                "--batch-export", metavar="FOLDER", default=None, help="write one figure per basis of BATCH_BASES"
+            )
+        args = parser.parse_args(argv)
+
+        if args.compute_only:
+            stages = self.compute_stages()
+            title_width = max(len(stage["title"]) for stage in stages) + 1
+            for stage in stages:
+                print(f"{stage['name']:<36} {stage['title']:<{title_width}} grid {stage['grid'].shape}")
+        elif args.export:
+            # the combined page needs every figure in this process, the stages are then built one after another.
+            if self.config.EXPORT_COMBINED is not None:
+                self.build_figures()
+            else:
+                self.export_figures()
+            if self.build_interpolation is not None:
+                self.build_interpolation_figure()
+        elif getattr(args, "batch_export", None) is not None:
+            print(f"{len(self.batch_export(args.batch_export))} figures written to {args.batch_export}")
+        else:
+            self.serve()
+
+# module level for st.cache_resource, the leading underscore keeps the app itself out of the cache key.
+def _cached_animation(_app: StageApp, key: str) -> go.Figure:
+    return stage_animation(_app.build_figures(), _app.config.FRAME_DURATION)
+
+def _cached_interpolation(_app: StageApp, key: str) -> go.Figure:
+    return _app.build_interpolation_figure()
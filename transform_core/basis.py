@@ -0,0 +1,183 @@
+""" Basis classes and the batched transformation shared by the visualizations """
+
+import warnings
+import numpy as np
+
+from transform_core.inverse import factorize
+from transform_core.profiling import profiled
+
+@profiled("transform.batch")
+def batch_transform(basis: np.ndarray, points: np.ndarray, out: np.ndarray=None, dtype: np.dtype=None) -> np.ndarray:
+    """
+    --> Applies a basis to a whole (M, N) point cloud or (H, W, N) grid in one vectorized call.
+    --> Points are stored as rows, so basis^T @ v for every column vector v is the same as points @ basis.
+    --> The points are flattened to (M, N) so a single matrix multiply is done instead of M small ones.
+    --> out can be a preallocated buffer of the result shape (it may be points itself for an in-place transform).
+    --> dtype selects the compute precision (e.g. np.float32), by default the common type of points and basis.
+    --> The result is written to out with same_kind casting, so a float result never gets truncated into an int buffer.
+    """
+    points = np.asarray(points)
+    if points.shape[-1] != basis.shape[0]:
+        raise ValueError(f"points of shape {points.shape} can not be transformed by a {basis.shape} basis")
+    result_shape = points.shape[:-1] + (basis.shape[1],)
+
+    if dtype is None:
+        dtype = np.result_type(points, basis)
+    matrix = np.asarray(basis, dtype=dtype)
+    flat_points = points.reshape(-1, points.shape[-1]).astype(dtype, copy=False)
+
+    if out is None:
+        return np.matmul(flat_points, matrix).reshape(result_shape)
+    if out.shape != result_shape:
+        raise ValueError(f"out buffer has shape {out.shape}, expected {result_shape}")
+    if not out.flags.c_contiguous:
+        raise ValueError("out buffer must be C contiguous")
+    np.matmul(flat_points, matrix, out=out.reshape(-1, basis.shape[1]), casting="same_kind")
+    return out
+
+@profiled("transform.blockwise")
+def blockwise_transform(
+    basis: np.ndarray, points: np.ndarray, out: np.ndarray=None, dtype: np.dtype=None, block_bytes: int=64*2**20
+) -> np.ndarray:
+    """
+    --> Same as batch_transform, but walks the grid block of rows by block of rows.
+    --> Only one block of about block_bytes is in memory at a time, so a np.memmap grid larger than RAM can be transformed.
+    --> out=points transforms the grid in place (written back to the backing file for a memmap).
+    """
+    points = np.asanyarray(points)
+    if dtype is None:
+        dtype = np.result_type(points, basis)
+    if out is None:
+        out = np.empty(points.shape[:-1] + (basis.shape[1],), dtype=dtype)
+
+    row_bytes = max(1, out[0].nbytes if out.ndim > 1 else out.itemsize)
+    block_rows = max(1, block_bytes // row_bytes)
+    for start in range(0, len(points), block_rows):
+        batch_transform(basis, points[start:start+block_rows], out[start:start+block_rows], dtype)
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
+
+class Basis():
+
+    def __init__(self, basis: np.ndarray, dtype: np.dtype=None) -> None:
+        """
+        --> Basis vectors are stored in a list one after the other, i.e. one basis vector per row.
+        --> The transpose of this is the correct matrix representation of the transformation.
+        --> Both forms are computed once here, so transforming a vector never transposes again.
+        --> dtype is the default compute precision of the batched transformation.
+        """
+        self.basis = np.asarray(basis)
+        self.dtype = dtype
+        self.matrix = np.ascontiguousarray(np.transpose(self.basis))
+        self._row_operators = {}
+
+    def _row_operator(self, dtype: np.dtype) -> np.ndarray:
+        # row vectors are transformed by the basis itself, cached per dtype so it is cast only once.
+        dtype = np.dtype(dtype)
+        if dtype not in self._row_operators:
+            self._row_operators[dtype] = np.ascontiguousarray(self.basis, dtype=dtype)
+        return self._row_operators[dtype]
+
+    def perform_transformation(self, vector: np.ndarray) -> np.ndarray:
+        return np.matmul(self.matrix, vector)
+
+    def perform_batch_transformation(self, points: np.ndarray, out: np.ndarray=None, dtype: np.dtype=None) -> np.ndarray:
+        dtype = self._dtype(points, dtype)
+        return batch_transform(self._row_operator(dtype), points, out, dtype)
+
+    def perform_blockwise_transformation(
+        self, points: np.ndarray, out: np.ndarray=None, dtype: np.dtype=None, block_bytes: int=64*2**20
+    ) -> np.ndarray:
+        # for grids that do not fit in memory, e.g. InitialBasis(..., backing_file=...).grid.
+        dtype = self._dtype(points, dtype)
+        return blockwise_transform(self._row_operator(dtype), points, out, dtype, block_bytes)
+
+    def _dtype(self, points: np.ndarray, dtype: np.dtype) -> np.dtype:
+        if dtype is None:
+            dtype = self.dtype
+        if dtype is None:
+            dtype = np.result_type(points, self.basis)
+        return dtype
+
+class InitialBasis(Basis):
+
+    @profiled("grid.generate")
+    def __init__(
+        self, basis: np.ndarray, grid_size: int, grid_spacing: float, dtype: np.dtype=None, backing_file: str=None
+    ) -> None:
+        """
+        --> The basis the grid is drawn in, along with the grid coordinates themselves.
+        --> grid[row, column] is the point [x, y], rows walk along y and columns walk along x.
+        --> An N x N basis gives an N dimensional grid the same way, grid[..., d] walks along axis N-1-d.
+        --> The grid is allocated once and filled by broadcasting the coordinates, no temporary copies are made.
+        --> With a backing_file the grid is a np.memmap (.npy format) instead, so it can be larger than memory.
+        --> Such a grid is float64 by default rather than integer, so it can be transformed in place by any basis.
+        """
+        super().__init__(basis, dtype)
+        dimension = self.basis.shape[0]
+        self.grid_cords = np.arange(-grid_size, grid_size+1, grid_spacing)
+        shape = (len(self.grid_cords),) * dimension + (dimension,)
+        if dtype is not None:
+            grid_dtype = dtype
+        else:
+            grid_dtype = np.result_type(self.grid_cords, np.float64) if backing_file is not None else self.grid_cords.dtype
+        if backing_file is not None:
+            self.grid = np.lib.format.open_memmap(backing_file, mode="w+", dtype=grid_dtype, shape=shape)
+        else:
+            self.grid = np.empty(shape, dtype=grid_dtype)
+        for coordinate in range(dimension):
+            axis = dimension - 1 - coordinate
+            self.grid[..., coordinate] = self.grid_cords.reshape((-1,) + (1,) * (dimension - 1 - axis))
+        if backing_file is not None:
+            self.grid.flush()
+
+class InverseTransformBasis(Basis):
+
+    def __init__(self, original_basis: np.ndarray, dtype: np.dtype=None) -> None:
+        """
+        --> The inverse of a matrix results in the inverse transform of the original matrix.
+        --> Takes in vectors, one after the other as before, not in matrix form.
+        --> Stores them in the vector after vector format as well, hence the two transpose.
+        --> The factorization is shared through the cache, so the same basis is only ever inverted once.
+        --> A singular basis raises SingularBasisError, a badly conditioned one warns with its condition number.
+        """
+        self.factorization = factorize(np.transpose(getattr(original_basis, "basis", original_basis)))
+        self.condition_number = self.factorization.condition_number
+        if self.factorization.ill_conditioned:
+            # warned on every basis built, not only when the cached factorization is first computed.
+            warnings.warn(
+                f"basis {self.factorization.matrix.T.tolist()} is badly conditioned "
+                f"(condition number {self.condition_number:.3g})", RuntimeWarning, stacklevel=2
+            )
+        super().__init__(np.transpose(self.factorization.inverse), dtype)
+
+    @profiled("transform.inverse")
+    def perform_batch_transformation(self, points: np.ndarray, out: np.ndarray=None, dtype: np.dtype=None) -> np.ndarray:
+        # the cached, condition checked inverse goes through the same batched multiply as any other basis.
+        return super().perform_batch_transformation(points, out, dtype)
+
+def interpolate_bases(bases: np.ndarray, steps: int) -> np.ndarray:
+    """
+    --> Linear interpolation between consecutive bases of a (K, N, N) stack, steps frames per transition.
+    --> Returns ((K-1)*steps + 1, N, N) bases, the first and last frames being exactly the first and last bases.
+    """
+    bases = np.asarray([getattr(basis, "basis", basis) for basis in bases], dtype=np.float64)
+    if len(bases) < 2:
+        raise ValueError("at least two bases are needed to interpolate between")
+    weights = np.arange(steps) / steps
+    start, end = bases[:-1, None], bases[1:, None]
+    transitions = start + weights[None, :, None, None] * (end - start)
+    return np.concatenate([transitions.reshape(-1, *bases.shape[1:]), bases[-1:]])
+
+@profiled("transform.interpolate")
+def interpolated_grids(grid: np.ndarray, bases: np.ndarray, steps: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    --> Every interpolation frame of the grid in one vectorized pass, as an (F, H, W, N) tensor.
+    --> The grid is transformed by all F interpolated bases with a single stacked matrix multiply.
+    --> Returns the (F, N, N) interpolated bases along with the frames.
+    """
+    frame_bases = interpolate_bases(bases, steps)
+    flat_points = np.asarray(grid, dtype=np.float64).reshape(-1, grid.shape[-1])
+    frames = np.matmul(flat_points[None], frame_bases).reshape((len(frame_bases),) + grid.shape)
+    return frame_bases, frames
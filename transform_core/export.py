@@ -0,0 +1,162 @@
+""" Batched figure export that shares one plotly.js bundle and skips unchanged figures """
+
+import os
+import json
+import hashlib
+import plotly.io as pio
+import plotly.offline as po
+import plotly.graph_objs as go
+
+from transform_core.profiling import profiled, span
+
+# "standalone" embeds plotly.js in every HTML file (what fig.write_html does),
+# "shared" writes plotly.js once next to the HTML files and references it,
+# "json" only writes the figure JSON, to be loaded by an app that already has plotly.js.
+EXPORT_MODES = ("standalone", "shared", "json")
+
+COMBINED_TEMPLATE = """<html>
+<head><meta charset="utf-8" /><title>{title}</title>{script}</head>
+<body style="background-color: #111111;">
+{divs}
+</body>
+</html>
+"""
+
+class FigureExporter():
+
+    def __init__(self, output_dir: str=".", mode: str="standalone", manifest: str=".export-manifest.json") -> None:
+        """
+        --> Figures are only queued by add, nothing is written until flush.
+        --> Every written file is recorded in the manifest with the hash of the figure it came from.
+        --> On the next run a figure whose hash (and file) is unchanged is not serialized to disk again.
+        """
+        if mode not in EXPORT_MODES:
+            raise ValueError(f"mode must be one of {EXPORT_MODES}, got {mode}")
+        self.output_dir = output_dir
+        self.mode = mode
+        self.manifest_path = os.path.join(output_dir, manifest)
+        self.bundle_name = f"plotly-{po.get_plotlyjs_version()}.min.js"
+        self.written = []
+        self.skipped = []
+        self._pending = []
+        self._manifest = self._read_manifest()
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path) as manifest_file:
+                return json.load(manifest_file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _path(self, name: str) -> str:
+        if self.mode == "json":
+            name = os.path.splitext(name)[0] + ".json"
+        return os.path.join(self.output_dir, name)
+
+    def _is_current(self, path: str, content_hash: str) -> bool:
+        return self._manifest.get(os.path.basename(path)) == content_hash and os.path.exists(path)
+
+    def _write(self, path: str, content: str, content_hash: str) -> None:
+        with open(path, "w", encoding="utf-8") as output_file:
+            output_file.write(content)
+        self._manifest[os.path.basename(path)] = content_hash
+        self.written.append(path)
+
+    def _write_bundle(self) -> None:
+        path = os.path.join(self.output_dir, self.bundle_name)
+        if not os.path.exists(path):
+            self._write(path, po.get_plotlyjs(), po.get_plotlyjs_version())
+
+    def _hash(self, figure_json: str) -> str:
+        return hashlib.sha256(f"{self.mode}:{figure_json}".encode()).hexdigest()
+
+    def prepare(self) -> None:
+        # the output folder, and the shared plotly.js bundle when needed, have to exist before any figure is written.
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.mode == "shared":
+            self._write_bundle()
+
+    def export(self, fig: go.Figure, name: str) -> tuple[str, str, bool]:
+        """
+        --> Writes one figure right away unless it is unchanged, returns its path, hash and whether it was written.
+        --> The manifest is neither changed nor saved, so several worker processes can export side by side.
+        --> The caller hands the results to record and saves the manifest once (see tc.export_stages).
+        """
+        path = self._path(name)
+        with span("export.to_json"):
+            figure_json = pio.to_json(fig)
+        content_hash = self._hash(figure_json)
+        if self._is_current(path, content_hash):
+            return path, content_hash, False
+        with span("export.write_html"):
+            with open(path, "w", encoding="utf-8") as output_file:
+                output_file.write(self._render(fig, figure_json))
+        return path, content_hash, True
+
+    def record(self, path: str, content_hash: str, written: bool) -> None:
+        self._manifest[os.path.basename(path)] = content_hash
+        (self.written if written else self.skipped).append(path)
+
+    def save_manifest(self) -> None:
+        with open(self.manifest_path, "w") as manifest_file:
+            json.dump(self._manifest, manifest_file, indent=4, sort_keys=True)
+
+    def add(self, fig: go.Figure, name: str) -> str:
+        self._pending.append((fig, name))
+        return self._path(name)
+
+    def add_combined(self, figs: list[go.Figure], name: str, title: str="") -> str:
+        # all the figures in one page, loading plotly.js once for the lot.
+        self._pending.append((list(figs), name, title))
+        return self._path(name)
+
+    def _render(self, fig: go.Figure, figure_json: str) -> str:
+        if self.mode == "json":
+            return figure_json
+        include_plotlyjs = True if self.mode == "standalone" else self.bundle_name
+        return pio.to_html(fig, include_plotlyjs=include_plotlyjs, full_html=True)
+
+    def _render_combined(self, figs: list[go.Figure], title: str) -> str:
+        if self.mode == "json":
+            return json.dumps([json.loads(pio.to_json(fig)) for fig in figs])
+        if self.mode == "standalone":
+            script = f'<script type="text/javascript">{po.get_plotlyjs()}</script>'
+        else:
+            script = f'<script src="{self.bundle_name}"></script>'
+        divs = "\n".join(pio.to_html(fig, include_plotlyjs=False, full_html=False) for fig in figs)
+        return COMBINED_TEMPLATE.format(title=title, script=script, divs=divs)
+
+    @profiled("export.flush")
+    def flush(self) -> list[str]:
+        """
+        --> Writes every queued figure that changed since the last run and saves the manifest once.
+        --> Returns the paths that were actually written.
+        """
+        self.written = []
+        self.skipped = []
+        if self._pending:
+            self.prepare()
+        else:
+            os.makedirs(self.output_dir, exist_ok=True)
+
+        for entry in self._pending:
+            path = self._path(entry[1])
+            with span("export.to_json"):
+                if isinstance(entry[0], list):
+                    # the page title is part of what gets written, so a title only change is not skipped.
+                    figure_json = json.dumps({"title": entry[2], "figures": [pio.to_json(fig) for fig in entry[0]]})
+                else:
+                    figure_json = pio.to_json(entry[0])
+            content_hash = self._hash(figure_json)
+            if self._is_current(path, content_hash):
+                self.skipped.append(path)
+                continue
+            with span("export.write_html"):
+                if isinstance(entry[0], list):
+                    self._write(path, self._render_combined(entry[0], entry[2]), content_hash)
+                else:
+                    self._write(path, self._render(entry[0], figure_json), content_hash)
+        self._pending = []
+
+        self.save_manifest()
+        return self.written
@@ -0,0 +1,222 @@
+""" Plotly rendering of a (transformed) grid along with its basis vectors """
+
+import numpy as np
+import plotly.graph_objs as go
+
+from typing import TYPE_CHECKING
+from transform_core.basis import interpolated_grids
+from transform_core.profiling import profiled, span
+
+# only needed for the annotation, a Grid without an exporter never loads transform_core.export.
+if TYPE_CHECKING:
+    from transform_core.export import FigureExporter
+
+# "lines" draws one trace per grid line, "packed" draws all rows and all columns as two traces broken by NaNs,
+# "webgl" is "packed" drawn with Scattergl.
+RENDER_MODES = ("lines", "packed", "webgl")
+
+def animation_controls(frame_names: list[str], frame_duration: int) -> dict:
+    """
+    --> Play / pause buttons and a slider over the named frames, as layout settings for fig.update_layout.
+    --> Playback is done by plotly.js in the browser.
+    """
+    play_args = {"frame": {"duration": frame_duration, "redraw": True}, "fromcurrent": True, "transition": {"duration": 0}}
+    jump_args = {"frame": {"duration": 0, "redraw": True}, "mode": "immediate", "transition": {"duration": 0}}
+    return {
+        "updatemenus": [
+            {
+                "type": "buttons",
+                "showactive": False,
+                "x": 0,
+                "y": -0.15,
+                "xanchor": "left",
+                "buttons": [
+                    {"label": "Play", "method": "animate", "args": [None, play_args]},
+                    {"label": "Pause", "method": "animate", "args": [[None], jump_args]}
+                ]
+            }
+        ],
+        "sliders": [
+            {
+                "x": 0.15,
+                "y": -0.1,
+                "len": 0.85,
+                "currentvalue": {"visible": False},
+                "steps": [
+                    {"label": frame_name, "method": "animate", "args": [[frame_name], jump_args]}
+                    for frame_name in frame_names
+                ]
+            }
+        ]
+    }
+
+class Grid():
+
+    def __init__(
+        self, grid_size: int, basis_colors: list[str], grid_color: str, vector_color: str=None, render_mode: str="lines",
+        exporter: "FigureExporter"=None
+    ) -> None:
+        """
+        --> Without an exporter every plotted figure is written right away with fig.write_html.
+        --> With one (see transform_core.export) the figures are only queued and written on exporter.flush().
+        """
+        if render_mode not in RENDER_MODES:
+            raise ValueError(f"render_mode must be one of {RENDER_MODES}, got {render_mode}")
+        self.grid_size = grid_size
+        self.basis_colors = basis_colors
+        self.grid_color = grid_color
+        self.vector_color = vector_color
+        self.render_mode = render_mode
+        self.exporter = exporter
+
+    def _arrow(self, vector: np.ndarray, color: str) -> go.layout.Annotation:
+        return go.layout.Annotation(
+            {
+                "x": vector[0],
+                "y": vector[1],
+                "xref": "x",
+                "yref": "y",
+                "axref": "x",
+                "ayref": "y",
+                "ax": 0,
+                "ay": 0,
+                "arrowhead": 5,
+                "arrowwidth": 3,
+                "arrowcolor": color
+            }
+        )
+
+    def basis_annotations(self, basis: np.ndarray, vector: np.ndarray=None) -> list[go.layout.Annotation]:
+        annotation = []
+        for index, bais_vector in enumerate(basis):
+            annotation.append(self._arrow(bais_vector, self.basis_colors[index]))
+        if vector is not None:
+            annotation.append(self._arrow(vector, self.vector_color))
+        return annotation
+
+    @profiled("render.annotations")
+    def plot_basis(self, basis: np.ndarray, fig: go.Figure, vector: np.ndarray=None) -> go.Figure:
+        fig.update_layout(annotations=self.basis_annotations(basis, vector))
+        return fig
+
+    def line_traces(self, grid: np.ndarray) -> list[go.Scatter]:
+        x_traces = []
+        y_traces = []
+        for index in range(1, grid.shape[0]-1, 1):
+            x_traces.append(
+                go.Scatter(
+                    x=grid[index, :, 0], y=grid[index, :, 1], mode="lines+markers",
+                    hovertemplate="(%{x}, %{y})<extra></extra>", marker_color=self.grid_color
+                )
+            )
+        for index in range(1, grid.shape[1]-1, 1):
+            y_traces.append(
+                go.Scatter(
+                    x=grid[:, index, 0], y=grid[:, index, 1], mode="lines+markers",
+                    hovertemplate="(%{x}, %{y})<extra></extra>", marker_color=self.grid_color
+                )
+            )
+        return x_traces + y_traces
+
+    def packed_traces(self, grid: np.ndarray, webgl: bool=False) -> list[go.Scatter]:
+        """
+        --> Same lines as line_traces, but all rows go in one trace and all columns in another.
+        --> A NaN point after every line breaks the polyline, so the lines are not joined to each other.
+        --> The trace count stays at 2 however large the grid is, which keeps the build and the render fast.
+        --> plotly.js breaks the line when either coordinate is NaN, so only x carries the breaks and needs floats.
+        --> Integer grids keep integer y (sent as 1 or 2 byte values), but their x still costs 4 bytes a point instead of
+        --> 1 or 2, so their figure data is larger than in "lines" mode (see benchmark_render.py).
+        """
+        scatter = go.Scattergl if webgl else go.Scatter
+        # the NaN breaks need a float array, float32 halves the embedded data whenever it holds the grid exactly.
+        float_dtype = np.float32 if np.array_equal(grid.astype(np.float32), grid) else np.float64
+        y_dtype = grid.dtype if np.issubdtype(grid.dtype, np.integer) else float_dtype
+        traces = []
+        for lines in (grid[1:-1, :, :], np.swapaxes(grid, 0, 1)[1:-1, :, :]):
+            x = np.full((lines.shape[0], lines.shape[1]+1), np.nan, dtype=float_dtype)
+            y = np.zeros((lines.shape[0], lines.shape[1]+1), dtype=y_dtype)
+            x[:, :-1] = lines[:, :, 0]
+            y[:, :-1] = lines[:, :, 1]
+            traces.append(
+                scatter(
+                    x=x.reshape(-1), y=y.reshape(-1), mode="lines+markers",
+                    hovertemplate="(%{x}, %{y})<extra></extra>", marker_color=self.grid_color
+                )
+            )
+        return traces
+
+    @profiled("render.traces")
+    def grid_traces(self, grid: np.ndarray, render_mode: str=None) -> list[go.Scatter]:
+        render_mode = render_mode if render_mode is not None else self.render_mode
+        if render_mode == "lines":
+            return self.line_traces(grid)
+        if render_mode == "packed":
+            return self.packed_traces(grid)
+        if render_mode == "webgl":
+            return self.packed_traces(grid, webgl=True)
+        raise ValueError(f"render_mode must be one of {RENDER_MODES}, got {render_mode}")
+
+    def build_figure(
+        self, basis: np.ndarray, grid: np.ndarray, title: str, vector: np.ndarray=None, render_mode: str=None
+    ) -> go.Figure:
+        # the figure of plot_grid, without writing it anywhere.
+        with span("render.figure"):
+            fig = go.Figure(self.grid_traces(grid, render_mode))
+            self._update_layout(fig, title)
+        return self.plot_basis(basis, fig, vector)
+
+    @profiled("render.plot_grid")
+    def plot_grid(
+        self, basis: np.ndarray, grid: np.ndarray, name: str, title: str, vector: np.ndarray=None, render_mode: str=None
+    ) -> go.Figure:
+        fig = self.build_figure(basis, grid, title, vector, render_mode)
+        self._write(fig, name)
+        return fig
+
+    @profiled("render.interpolation")
+    def plot_interpolation(
+        self, bases: list[np.ndarray], grid: np.ndarray, name: str, titles: list[str], steps: int=30,
+        frame_duration: int=100, render_mode: str=None
+    ) -> go.Figure:
+        """
+        --> One figure animating the grid linearly from each basis to the next one, steps frames per transition.
+        --> All the frames are computed up front in one vectorized pass, see tc.interpolated_grids.
+        --> The frames play in the browser, the server only ever sends this one figure.
+        --> titles holds one title per basis, frames in between are titled with the transition they belong to.
+        """
+        frame_bases, frame_grids = interpolated_grids(grid, bases, steps)
+        frames = []
+        for index, (frame_basis, frame_grid) in enumerate(zip(frame_bases, frame_grids)):
+            stage, step = divmod(index, steps)
+            title = titles[stage] if step == 0 else f"{titles[stage]} --> {titles[stage+1]} ({step}/{steps})"
+            frames.append(
+                go.Frame(
+                    data=self.grid_traces(frame_grid, render_mode), name=str(index),
+                    layout=go.Layout(title=title, annotations=self.basis_annotations(frame_basis))
+                )
+            )
+
+        fig = go.Figure(data=frames[0].data, frames=frames)
+        self._update_layout(fig, titles[0])
+        fig.update_layout(**animation_controls([frame.name for frame in frames], frame_duration))
+        fig = self.plot_basis(frame_bases[0], fig)
+        self._write(fig, name)
+        return fig
+
+    def _update_layout(self, fig: go.Figure, title: str) -> None:
+        fig.update_layout(
+            title=title,
+            xaxis_title="X axis",
+            yaxis_title="Y axis",
+            showlegend=False,
+            template="plotly_dark",
+            yaxis={"range": [-self.grid_size, self.grid_size]},
+            xaxis={"range": [-self.grid_size, self.grid_size]}
+        )
+
+    @profiled("render.write")
+    def _write(self, fig: go.Figure, name: str) -> None:
+        if self.exporter is not None:
+            self.exporter.add(fig, name)
+        else:
+            fig.write_html(name)
@@ -0,0 +1,83 @@
+""" Cached and numerically checked inverses of basis matrices """
+
+import numpy as np
+
+from collections import OrderedDict
+from transform_core.profiling import profiled
+
+# beyond this condition number roughly half of the float64 digits of the inverse are noise.
+ILL_CONDITIONED = 1e8
+
+class SingularBasisError(ValueError):
+    pass
+
+class Factorization():
+
+    @profiled("inverse.factorize")
+    def __init__(self, matrix: np.ndarray) -> None:
+        """
+        --> Singular values and inverse of a square matrix in the column form.
+        --> The singular values give the condition number (largest / smallest) for free.
+        --> A smallest singular value at round-off level of the largest one means the basis vectors are linearly dependent.
+        --> i.e. the span collapses to a line (or a point) and there is no inverse transform.
+        """
+        self.matrix = np.array(matrix, dtype=np.float64)
+        if self.matrix.ndim != 2 or self.matrix.shape[0] != self.matrix.shape[1]:
+            raise ValueError(f"only square matrices can be inverted, got {self.matrix.shape}")
+
+        self.singular_values = np.linalg.svd(self.matrix, compute_uv=False)
+        tolerance = self.singular_values[0] * max(self.matrix.shape) * np.finfo(np.float64).eps
+        if self.singular_values[-1] <= tolerance:
+            raise SingularBasisError(
+                f"basis {self.matrix.T.tolist()} is singular (singular values {self.singular_values.tolist()}), "
+                "its vectors are linearly dependent and the transformation has no inverse"
+            )
+        self.condition_number = self.singular_values[0] / self.singular_values[-1]
+        self.determinant = np.linalg.det(self.matrix)
+        # the warning itself is left to whoever uses the inverse (see tc.InverseTransformBasis), so it points at their code.
+        self.ill_conditioned = self.condition_number > ILL_CONDITIONED
+
+        # the matrix is known to be well enough conditioned by now, so the plain LU inverse is safe to use.
+        self.inverse = np.linalg.inv(self.matrix)
+        self.inverse.setflags(write=False)
+
+class FactorizationCache():
+
+    def __init__(self, maxsize: int=128) -> None:
+        """
+        --> Factorizations memoized by matrix content, so sweeping back and forth over bases factorizes each one once.
+        --> Least recently used entries are evicted once maxsize matrices are held.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, matrix: np.ndarray) -> Factorization:
+        matrix = np.ascontiguousarray(matrix, dtype=np.float64)
+        key = (matrix.shape, matrix.tobytes())
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        self.misses += 1
+        factorization = Factorization(matrix)
+        self._entries[key] = factorization
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return factorization
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+# cache shared by every InverseTransformBasis.
+factorization_cache = FactorizationCache()
+
+def factorize(matrix: np.ndarray) -> Factorization:
+    return factorization_cache.get(matrix)
@@ -0,0 +1,102 @@
+""" Lazily composed chain of transformations, applied to the grid in a single pass """
+
+import numpy as np
+
+from transform_core.basis import batch_transform
+from transform_core.profiling import profiled
+
+class TransformPipeline():
+
+    def __init__(self, dtype: np.dtype=None, atol: float=1e-12) -> None:
+        """
+        --> Stages (T, T^-1, rotation, shear, translation) are only queued here, nothing touches the grid.
+        --> Every stage is kept as a 3x3 affine matrix in the vector-per-row form, i.e. [x, y, 1] @ stage.
+        --> Chaining T then S is therefore just T @ S, so any chain collapses into one matrix before the grid is used.
+        --> Products of the first k stages are cached, so every intermediate frame costs one pass as well.
+        --> A chain whose product is within atol of the identity (e.g. T * T^-1) skips the grid pass altogether.
+        """
+        self.dtype = dtype
+        self.atol = atol
+        self.names = []
+        self.stages = []
+        self._prefix = [np.eye(3, dtype=int)]
+
+    def __len__(self) -> int:
+        return len(self.stages)
+
+    def _push(self, stage: np.ndarray, name: str) -> "TransformPipeline":
+        self.names.append(name if name is not None else f"stage-{len(self.stages)}")
+        self.stages.append(stage)
+        return self
+
+    def then(self, basis: np.ndarray, name: str=None) -> "TransformPipeline":
+        # accepts a tc.Basis as well as the raw basis vectors, one per row.
+        basis = np.asarray(getattr(basis, "basis", basis))
+        if basis.shape != (2, 2):
+            raise ValueError(f"only 2x2 bases can be chained, got {basis.shape}")
+        # stages keep the dtype of their basis, so an integer chain still gives an integer grid.
+        stage = np.eye(3, dtype=basis.dtype)
+        stage[:2, :2] = basis
+        return self._push(stage, name)
+
+    def rotate(self, angle: float, name: str=None) -> "TransformPipeline":
+        # anti-clockwise rotation by angle radians, i_hat goes to [cos, sin] and j_hat to [-sin, cos].
+        cos, sin = np.cos(angle), np.sin(angle)
+        return self.then(np.array([[cos, sin], [-sin, cos]]), name if name is not None else f"R({angle:.3g})")
+
+    def shear(self, x: float=0, y: float=0, name: str=None) -> "TransformPipeline":
+        # x shears along the X axis (j_hat goes to [x, 1]), y shears along the Y axis (i_hat goes to [1, y]).
+        return self.then(np.array([[1, y], [x, 1]]), name if name is not None else f"S({x:.3g}, {y:.3g})")
+
+    def translate(self, x: float, y: float, name: str=None) -> "TransformPipeline":
+        stage = np.eye(3, dtype=np.result_type(x, y))
+        stage[2, :2] = [x, y]
+        return self._push(stage, name if name is not None else f"M({x:.3g}, {y:.3g})")
+
+    def operator(self, upto: int=None) -> np.ndarray:
+        """
+        --> The 3x3 affine product of the first upto stages (all of them by default).
+        """
+        upto = len(self.stages) if upto is None else upto
+        if not 0 <= upto <= len(self.stages):
+            raise IndexError(f"pipeline has {len(self.stages)} stages, asked for {upto}")
+        # stages may have been queued since the last call, extend the cached products up to what is needed.
+        for index in range(len(self._prefix)-1, upto):
+            self._prefix.append(np.matmul(self._prefix[index], self.stages[index]))
+        return self._prefix[upto]
+
+    def basis(self, upto: int=None) -> np.ndarray:
+        # linear part of the composed chain, in the same vector-per-row form as tc.Basis.basis.
+        return self.operator(upto)[:2, :2]
+
+    def is_identity(self, upto: int=None) -> bool:
+        return np.allclose(self.operator(upto), np.eye(3), rtol=0, atol=self.atol)
+
+    @profiled("transform.pipeline")
+    def apply(self, points: np.ndarray, upto: int=None, out: np.ndarray=None, dtype: np.dtype=None) -> np.ndarray:
+        """
+        --> Applies the first upto stages to an (N, 2) point cloud or (H, W, 2) grid in a single pass.
+        """
+        operator = self.operator(upto)
+        dtype = dtype if dtype is not None else self.dtype
+        if dtype is None:
+            dtype = np.result_type(points, operator)
+
+        if self.is_identity(upto):
+            if out is None:
+                return np.array(points, dtype=dtype)
+            np.copyto(out, points, casting="same_kind")
+            return out
+
+        transformed = batch_transform(operator[:2, :2], points, out, dtype)
+        if np.any(operator[2, :2]):
+            transformed += operator[2, :2].astype(dtype)
+        return transformed
+
+    def frame(self, index: int, points: np.ndarray, dtype: np.dtype=None) -> np.ndarray:
+        # frame 0 is the untouched grid, frame k has the first k stages applied.
+        return self.apply(points, upto=index, dtype=dtype)
+
+    def frames(self, points: np.ndarray, dtype: np.dtype=None) -> list[np.ndarray]:
+        # every intermediate frame, each one computed straight from the original points.
+        return [self.frame(index, points, dtype) for index in range(1, len(self.stages)+1)]
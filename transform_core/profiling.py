@@ -0,0 +1,161 @@
+""" Per-stage wall time, call counts and allocations of the transform and render pipeline """
+
+import os
+import json
+import time
+import atexit
+import functools
+import threading
+import contextlib
+import tracemalloc
+
+# TRANSFORM_CORE_PROFILE=1 records timings, =alloc records the net allocations of every span as well (slower).
+# TRANSFORM_CORE_PROFILE_OUTPUT=<file> saves the records when the process exits, as a Chrome trace if it ends in .trace.json.
+PROFILE_ENV = "TRANSFORM_CORE_PROFILE"
+OUTPUT_ENV = "TRANSFORM_CORE_PROFILE_OUTPUT"
+
+class Profiler():
+
+    def __init__(self, enabled: bool=False, allocations: bool=False) -> None:
+        """
+        --> Records one event per span: name, start, duration, process, thread and nesting depth (and net allocated bytes).
+        --> When disabled span() hands back one shared no-op context manager, so instrumented code costs a flag check.
+        --> Allocations come from tracemalloc, which slows every allocation down, so they are only traced when asked for.
+        """
+        self.enabled = False
+        self.allocations = False
+        self.events = []
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+        if enabled:
+            self.enable(allocations)
+
+    def enable(self, allocations: bool=False) -> None:
+        self.enabled = True
+        self.allocations = allocations
+        if allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self) -> None:
+        self.enabled = False
+        if self.allocations and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.allocations = False
+
+    def reset(self) -> None:
+        self.events = []
+
+    def span(self, name: str):
+        if not self.enabled:
+            return _NO_SPAN
+        return self._span(name)
+
+    @contextlib.contextmanager
+    def _span(self, name: str):
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        allocated = tracemalloc.get_traced_memory()[0] if self.allocations else 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self._local.depth = depth
+            self.events.append({
+                "name": name,
+                "start_s": start - self._origin,
+                "duration_s": duration,
+                "process": os.getpid(),
+                "thread": threading.get_ident(),
+                "depth": depth,
+                "allocated_kb": (tracemalloc.get_traced_memory()[0] - allocated) / 1024 if self.allocations else None
+            })
+
+    def profiled(self, name: str=None):
+        """
+        --> Decorator recording every call of the function as a span, named after the function by default.
+        --> The wrapper only checks the enabled flag when profiling is off.
+        """
+        def decorate(function):
+            span_name = name or function.__qualname__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with self._span(span_name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def call_recorded(self, function, *args, **kwargs) -> tuple:
+        """
+        --> Calls function and returns its result along with the events recorded meanwhile, taken out of self.events.
+        --> Meant for worker processes, whose profiler is their own copy: the parent adds the events with merge().
+        --> Start times are handed over as raw perf_counter values, the same clock in every process of the machine.
+        """
+        first_event = len(self.events)
+        try:
+            result = function(*args, **kwargs)
+            events = [dict(event, start_s=event["start_s"] + self._origin) for event in self.events[first_event:]]
+        finally:
+            del self.events[first_event:]
+        return result, events
+
+    def merge(self, events: list[dict]) -> None:
+        # events of call_recorded, made relative to this profiler's origin again.
+        self.events.extend(dict(event, start_s=event["start_s"] - self._origin) for event in events)
+
+    def stats(self) -> list[dict]:
+        # one row per span name: call count, total / mean / max wall time and net allocations, slowest total first.
+        rows = {}
+        for event in self.events:
+            row = rows.setdefault(
+                event["name"], {"name": event["name"], "calls": 0, "total_s": 0.0, "max_s": 0.0, "allocated_kb": None}
+            )
+            row["calls"] += 1
+            row["total_s"] += event["duration_s"]
+            row["max_s"] = max(row["max_s"], event["duration_s"])
+            if event["allocated_kb"] is not None:
+                row["allocated_kb"] = (row["allocated_kb"] or 0.0) + event["allocated_kb"]
+        for row in rows.values():
+            row["mean_s"] = row["total_s"] / row["calls"]
+        return sorted(rows.values(), key=lambda row: -row["total_s"])
+
+    def to_json(self, path: str) -> None:
+        with open(path, "w") as profile_file:
+            json.dump({"stats": self.stats(), "events": self.events}, profile_file, indent=2)
+
+    def to_chrome_trace(self, path: str) -> None:
+        # complete ("X") events in microseconds, opens in chrome://tracing or https://ui.perfetto.dev.
+        trace_events = [
+            {
+                "name": event["name"],
+                "ph": "X",
+                "ts": event["start_s"] * 1e6,
+                "dur": event["duration_s"] * 1e6,
+                "pid": event["process"],
+                "tid": event["thread"],
+                "args": {} if event["allocated_kb"] is None else {"allocated_kb": event["allocated_kb"]}
+            }
+            for event in self.events
+        ]
+        with open(path, "w") as trace_file:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, trace_file)
+
+    def save(self, path: str) -> None:
+        if path.endswith(".trace.json"):
+            self.to_chrome_trace(path)
+        else:
+            self.to_json(path)
+
+_NO_SPAN = contextlib.nullcontext()
+
+profiler = Profiler(
+    enabled=os.environ.get(PROFILE_ENV, "0") not in ("", "0"), allocations=os.environ.get(PROFILE_ENV) == "alloc"
+)
+span = profiler.span
+profiled = profiler.profiled
+
+if profiler.enabled and os.environ.get(OUTPUT_ENV):
+    atexit.register(profiler.save, os.environ[OUTPUT_ENV])
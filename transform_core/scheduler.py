@@ -0,0 +1,119 @@
+""" Runs the grid and figure stages of the visualizations concurrently, following their declared dependencies """
+
+import os
+import numpy as np
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from transform_core.basis import batch_transform
+from transform_core.export import FigureExporter
+from transform_core.grid import Grid
+from transform_core.profiling import profiler, span
+
+class StageScheduler():
+
+    def __init__(self, max_workers: int=None, processes: bool=True) -> None:
+        """
+        --> Named stages, each a function along with the stages it depends on.
+        --> A stage is submitted as soon as every stage it depends on is done, their results are passed to it last.
+        --> processes=True runs the stages in a process pool, building plotly figures holds the GIL so threads barely help.
+        --> Functions and arguments then have to be picklable, i.e. defined at module level (see render_stage).
+        --> With profiling on, the spans recorded in the worker processes are merged into the profiler of this one.
+        """
+        self.max_workers = max_workers or os.cpu_count()
+        self.processes = processes
+        self.stages = {}
+
+    def add(self, name: str, function, *args, depends_on: tuple[str]=(), **kwargs) -> "StageScheduler":
+        if name in self.stages:
+            raise ValueError(f"stage {name} was already added")
+        self.stages[name] = (function, args, tuple(depends_on), kwargs)
+        return self
+
+    def run(self) -> dict:
+        """
+        --> Runs every stage and returns their results by name.
+        --> Unknown or circular dependencies raise ValueError before anything is left hanging.
+        """
+        for name, (_, _, depends_on, _) in self.stages.items():
+            missing = [dependency for dependency in depends_on if dependency not in self.stages]
+            if missing:
+                raise ValueError(f"stage {name} depends on unknown stages {missing}")
+
+        executor_class = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+        # threads already record into the shared profiler, processes send their events back with every result.
+        recorded = self.processes and profiler.enabled
+        results, pending, running = {}, dict(self.stages), {}
+        with span("scheduler.run"), executor_class(max_workers=self.max_workers) as executor:
+            while pending or running:
+                for name, (function, args, depends_on, kwargs) in list(pending.items()):
+                    if all(dependency in results for dependency in depends_on):
+                        dependency_results = [results[dependency] for dependency in depends_on]
+                        if recorded:
+                            future = executor.submit(_recorded_stage, function, *args, *dependency_results, **kwargs)
+                        else:
+                            future = executor.submit(function, *args, *dependency_results, **kwargs)
+                        running[future] = name
+                        del pending[name]
+                if not running:
+                    raise ValueError(f"stages {list(pending)} depend on each other in a cycle")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, result = running.pop(future), future.result()
+                    if recorded:
+                        result, events = result
+                        profiler.merge(events)
+                    results[name] = result
+        return results
+
+def _recorded_stage(function, *args, **kwargs) -> tuple:
+    # module level so the process pool can pickle it, profiler is the worker's own copy.
+    return profiler.call_recorded(function, *args, **kwargs)
+
+def render_stage(
+    grid_settings: dict, output_dir: str, mode: str, stage: dict, grid: np.ndarray=None
+) -> tuple[str, str, bool]:
+    """
+    --> Builds the figure of one stage and exports it, in whatever process the scheduler runs it in.
+    --> grid_settings are the tc.Grid arguments, stage the plot_grid ones (basis, name, title and optionally grid, vector).
+    --> grid is the result of the stage this one depends on, when its grid is computed by another stage.
+    """
+    grid_obj = Grid(**grid_settings)
+    fig = grid_obj.build_figure(
+        stage["basis"], grid if grid is not None else stage["grid"], stage["title"], stage.get("vector"),
+        stage.get("render_mode")
+    )
+    return FigureExporter(output_dir, mode).export(fig, stage["name"])
+
+def export_stages(
+    grid_settings: dict, stages: list[dict], exporter: FigureExporter, grid: np.ndarray=None, max_workers: int=None,
+    processes: bool=True
+) -> list[str]:
+    """
+    --> Exports every stage concurrently through a StageScheduler and records them all in the exporter's manifest.
+    --> A stage either brings its own grid, or a "transform" basis that a grid stage of its own applies to the shared grid.
+    --> With "depends_on" naming another transform stage, the transform is applied to that stage's grid instead (a chain).
+    --> Returns the paths that were actually written, unchanged figures are skipped like in FigureExporter.flush.
+    """
+    scheduler = StageScheduler(max_workers, processes)
+    for stage in stages:
+        stage = dict(stage)
+        name = stage["name"]
+        if "transform" in stage:
+            source = stage.pop("depends_on", None)
+            grid_stage = f"{name}:grid"
+            if source is None:
+                scheduler.add(grid_stage, batch_transform, stage.pop("transform"), grid)
+            else:
+                scheduler.add(grid_stage, batch_transform, stage.pop("transform"), depends_on=[f"{source}:grid"])
+            scheduler.add(name, render_stage, grid_settings, exporter.output_dir, exporter.mode, stage, depends_on=[grid_stage])
+        else:
+            scheduler.add(name, render_stage, grid_settings, exporter.output_dir, exporter.mode, stage)
+
+    exporter.written = []
+    exporter.skipped = []
+    exporter.prepare()
+    results = scheduler.run()
+    for stage in stages:
+        exporter.record(*results[stage["name"]])
+    exporter.save_manifest()
+    return exporter.written